@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import time
+from typing import NamedTuple
+
+from engine import Engine
+from AI.evaluation_cache import EvaluationCache, CacheEntry
+from Structures.canonical import canonicalize_engine
+from Structures.line_index import LineIndex
+
+WIN_SCORE = 1_000_000
+
+# transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class ScoredMove(NamedTuple):
+    score: float
+    attack: int
+    defense: int
+    cell: tuple[int, int]
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = 0
+        self.depth = 0
+        self.elapsed = 0.0
+        # the move was taken from the evaluation cache
+        self.cached = False
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"depth {self.depth}, {self.nodes} nodes in {self.elapsed:.3f}s "
+                f"({self.nodes_per_second:.0f} nodes/s){', cached' if self.cached else ''}")
+
+
+class AlphaBetaPlayer:
+    def __init__(self, depth=4, time_limit=1.0, max_moves=12, neighbourhood=1, max_transpositions=1_000_000,
+                 use_threats=True, cache: EvaluationCache | None = None):
+        """
+        iterative deepening alpha-beta search for k-in-a-row on an unlimited board
+        :param depth: maximal search depth
+        :param time_limit: seconds per move; the best move of the last finished depth is returned
+        :param max_moves: number of best ordered moves searched in every node
+        :param neighbourhood: only empty cells this close to a mark are considered
+        :param max_transpositions: the table is cleared once it gets bigger
+        :param use_threats: track the threats on the searched engine and cut the lines decided by them
+        :param cache: results of the searched positions shared by all the positions equal up to
+                      a translation or a symmetry, also across runs; a position searched to the full depth
+                      before isn't searched again, a shallower one is searched on from its depth
+        """
+        self.depth = depth
+        self.time_limit = time_limit
+        self.max_moves = max_moves
+        self.neighbourhood = neighbourhood
+        self.max_transpositions = max_transpositions
+        self.use_threats = use_threats
+        self.cache = cache
+
+        # zobrist hash -> (depth, value, flag, best move)
+        self.transpositions: dict[int, tuple[int, int, int, tuple[int, int] | None]] = {}
+        self.stats = SearchStats()
+
+        # number of marks around every cell close to the marks
+        self.__neighbours: dict[tuple[int, int], int] = {}
+        self.__offsets = [
+            (i, j)
+            for i in range(-neighbourhood, neighbourhood + 1)
+            for j in range(-neighbourhood, neighbourhood + 1)
+            if i or j
+        ]
+        self.__deadline = 0.0
+
+    # <editor-fold desc="Move Generation">
+    def __make(self, engine: Engine, cell):
+        engine.place(*cell)
+        row, col = cell
+        for i, j in self.__offsets:
+            key = row + i, col + j
+            self.__neighbours[key] = self.__neighbours.get(key, 0) + 1
+
+    def __unmake(self, engine: Engine):
+        row, col = engine.undo()
+        for i, j in self.__offsets:
+            key = row + i, col + j
+            self.__neighbours[key] -= 1
+            if not self.__neighbours[key]:
+                del self.__neighbours[key]
+
+    def __line_value(self, engine: Engine, row, col, mark) -> tuple[int, bool]:
+        # value of putting the mark on (row, col) and whether it wins
+        k = engine.marks_needed_to_win
+        value = 0
+        for option, (d_row, d_col) in LineIndex.steps.items():
+            back, forward = engine.lines.potential_run(row, col, mark, option)
+            length = back + 1 + forward
+            if length >= k:
+                return WIN_SCORE, True
+
+            open_ends = (
+                (engine.mark_at(row - (back + 1) * d_row, col - (back + 1) * d_col) is None)
+                + (engine.mark_at(row + (forward + 1) * d_row, col + (forward + 1) * d_col) is None)
+            )
+            if open_ends:
+                value += 8 ** length * open_ends * (4 if length == k - 1 and open_ends == 2 else 1)
+
+        return value, False
+
+    def __scored_moves(self, engine: Engine) -> list[ScoredMove]:
+        """
+        empty cells near the marks ordered from the most promising one;
+        winning cells go first, cells blocking the opponent's win right after them
+        """
+        mark = engine.current_mark
+        opponent = engine.marks[(engine.move_counter + 1) % 2]
+        moves = []
+        for row, col in self.__neighbours:
+            if engine.mark_at(row, col) is not None:
+                continue
+
+            attack, wins = self.__line_value(engine, row, col, mark)
+            defense, blocks = self.__line_value(engine, row, col, opponent)
+            score = attack + 0.9 * defense
+            if wins:
+                score = 4 * WIN_SCORE
+            elif blocks:
+                score = 2 * WIN_SCORE
+            moves.append(ScoredMove(score, attack, defense, (row, col)))
+
+        moves.sort(reverse=True)
+        return moves
+
+    # </editor-fold>
+
+    # <editor-fold desc="Search">
+    @staticmethod
+    def __position_key(engine: Engine) -> int:
+        # the marks alone don't say whose turn it is; the first mover changes every round
+        return engine.hash ^ engine.zobrist.turn_key(engine.current_mark, engine.marks_needed_to_win)
+
+    def __check_time(self):
+        if time.perf_counter() > self.__deadline:
+            raise _SearchTimeout
+
+    def __ordered(self, moves: list[ScoredMove], first) -> list[tuple[int, int]]:
+        cells = [move.cell for move in moves[:self.max_moves]]
+        if first is not None and first in cells:
+            cells.remove(first)
+            cells.insert(0, first)
+        return cells
+
+    def __search(self, engine: Engine, depth, alpha, beta, ply) -> int:
+        self.stats.nodes += 1
+        self.__check_time()
+
+        best_move = None
+        key = self.__position_key(engine)
+        entry = self.transpositions.get(key)
+        if entry is not None:
+            entry_depth, value, flag, best_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        threats = engine.threats
+        # a four of the side to move wins with the next move, without generating the moves
+        if threats is not None and threats.winning_cells(engine.current_mark):
+            return WIN_SCORE - ply
+
+        moves = self.__scored_moves(engine)
+        if not moves:
+            return 0
+        # the side to move wins with the next move
+        if moves[0].score == 4 * WIN_SCORE:
+            return WIN_SCORE - ply
+        # the opponent wins on two different cells and only one of them can be blocked
+        if threats is not None and len(threats.winning_cells(engine.marks[(engine.move_counter + 1) % 2])) > 1:
+            return -(WIN_SCORE - ply - 1)
+        if depth == 0:
+            # the side to move can either push its best attack or block the opponent's one
+            return int(max(move.attack for move in moves) - 0.5 * max(move.defense for move in moves))
+
+        original_alpha = alpha
+        best_value = -WIN_SCORE * 2
+        # a forced block leaves no choice
+        cells = [moves[0].cell] if moves[0].score == 2 * WIN_SCORE else self.__ordered(moves, best_move)
+        for cell in cells:
+            self.__make(engine, cell)
+            try:
+                value = -self.__search(engine, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self.__unmake(engine)
+
+            if value > best_value:
+                best_value, best_move = value, cell
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= original_alpha:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transpositions[key] = depth, best_value, flag, best_move
+        return best_value
+
+    def __search_root(self, engine: Engine, depth, moves: list[ScoredMove], first) -> tuple[tuple[int, int], int]:
+        alpha, beta = -WIN_SCORE * 2, WIN_SCORE * 2
+        best_move, best_value = None, -WIN_SCORE * 2
+        for cell in self.__ordered(moves, first):
+            self.__make(engine, cell)
+            try:
+                value = -self.__search(engine, depth - 1, -beta, -alpha, 1)
+            finally:
+                self.__unmake(engine)
+
+            if value > best_value:
+                best_value, best_move = value, cell
+            alpha = max(alpha, value)
+
+        self.transpositions[self.__position_key(engine)] = depth, best_value, EXACT, best_move
+        return best_move, best_value
+
+    # </editor-fold>
+
+    def choose_move(self, engine: Engine) -> tuple[int, int]:
+        """
+        searches the engine's position; the engine is left as it was
+        :return: (row, col) of the best move found within the time limit
+        """
+        start = time.perf_counter()
+        self.__deadline = start + self.time_limit
+        self.stats = SearchStats()
+        if len(self.transpositions) > self.max_transpositions:
+            self.transpositions.clear()
+
+        if not engine.history:
+            return 0, 0
+        if self.use_threats:
+            engine.track_threats()
+
+        self.__neighbours = {}
+        for row, col in engine.history:
+            for i, j in self.__offsets:
+                key = row + i, col + j
+                self.__neighbours[key] = self.__neighbours.get(key, 0) + 1
+
+        moves = self.__scored_moves(engine)
+        best_move = moves[0].cell
+        # winning or forced moves don't need a search
+        if moves[0].score >= 2 * WIN_SCORE:
+            return best_move
+
+        first_depth = 1
+        canonical = entry = None
+        if self.cache is not None:
+            canonical = canonicalize_engine(engine)
+            entry = self.cache.get(canonical.key)
+            # a different position with the same key has its move on a taken cell
+            if entry is not None and engine.mark_at(*canonical.from_canonical(*entry.move)) is None:
+                best_move = canonical.from_canonical(*entry.move)
+                self.stats.depth = first_depth = entry.depth
+                if entry.depth >= self.depth or abs(entry.value) >= WIN_SCORE - self.depth:
+                    self.stats.cached = True
+                    self.stats.elapsed = time.perf_counter() - start
+                    return best_move
+                first_depth += 1
+            else:
+                entry = None
+
+        value = None
+        try:
+            for depth in range(first_depth, self.depth + 1):
+                best_move, value = self.__search_root(engine, depth, moves, best_move)
+                self.stats.depth = depth
+                if abs(value) >= WIN_SCORE - self.depth:
+                    break
+        except _SearchTimeout:
+            pass
+        finally:
+            self.stats.elapsed = time.perf_counter() - start
+
+        # only a finished depth is kept, and only if it's deeper than the kept one
+        if canonical is not None and value is not None and (entry is None or self.stats.depth > entry.depth):
+            self.cache.put(canonical.key, CacheEntry(self.stats.depth, value, canonical.to_canonical(*best_move)))
+        return best_move
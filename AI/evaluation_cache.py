@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sqlite3
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class CacheEntry(NamedTuple):
+    # depth of the finished search
+    depth: int
+    value: int
+    # best move in the canonical position
+    move: tuple[int, int]
+
+
+class CacheStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.memory_hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    def __repr__(self):
+        return (f"{self.lookups} lookups, {self.hit_rate:.0%} hits "
+                f"({self.memory_hits} in memory, {self.disk_hits} on disk)")
+
+
+class EvaluationCache:
+    def __init__(self, path, capacity=100_000, commit_every=64):
+        """
+        search results by the canonical key of the position, kept in sqlite across runs;
+        the most recently used ones are kept in memory in front of it
+        :param path: the sqlite file; ":memory:" keeps nothing after the run
+        :param capacity: number of entries kept in memory
+        :param commit_every: new entries written to the disk at once
+        """
+        self.path = path
+        self.capacity = capacity
+        self.commit_every = commit_every
+        self.stats = CacheStats()
+
+        # the game searches on a worker thread and closes the cache on the main one, never both at once
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS positions ("
+            "key BLOB PRIMARY KEY, depth INTEGER, value INTEGER, row INTEGER, col INTEGER) WITHOUT ROWID")
+        self.__memory: OrderedDict[bytes, CacheEntry] = OrderedDict()
+        self.__pending = 0
+
+    def __remember(self, key, entry: CacheEntry):
+        self.__memory[key] = entry
+        self.__memory.move_to_end(key)
+        if len(self.__memory) > self.capacity:
+            self.__memory.popitem(last=False)
+
+    def get(self, key: bytes) -> CacheEntry | None:
+        entry = self.__memory.get(key)
+        if entry is not None:
+            self.__memory.move_to_end(key)
+            self.stats.memory_hits += 1
+            return entry
+
+        row = self.connection.execute(
+            "SELECT depth, value, row, col FROM positions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats.misses += 1
+            return None
+
+        depth, value, move_row, move_col = row
+        entry = CacheEntry(depth, value, (move_row, move_col))
+        self.stats.disk_hits += 1
+        self.__remember(key, entry)
+        return entry
+
+    def put(self, key: bytes, entry: CacheEntry):
+        """
+        keeps the entry unless a deeper search of the position is kept already
+        """
+        known = self.__memory.get(key)
+        if known is not None and known.depth > entry.depth:
+            return
+
+        self.__remember(key, entry)
+        self.connection.execute(
+            "INSERT INTO positions VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET depth = excluded.depth, value = excluded.value, "
+            "row = excluded.row, col = excluded.col WHERE excluded.depth >= positions.depth",
+            (key, entry.depth, entry.value, *entry.move))
+        self.__pending += 1
+        if self.__pending >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        self.connection.commit()
+        self.__pending = 0
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
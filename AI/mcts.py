@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# workers import only this module and the engine, never pygame
+from engine import Engine
+
+# (marks needed to win, marks in the order of the round, moves of the round)
+Position = tuple[int, tuple[str, ...], list[tuple[int, int]]]
+
+
+# <editor-fold desc="Worker Functions">
+def _rebuild(position: Position) -> Engine:
+    marks_needed_to_win, marks, history = position
+    engine = Engine(marks_needed_to_win, marks=marks)
+    for row, col in history:
+        engine.place(row, col)
+    return engine
+
+
+def _near_cells(engine: Engine, neighbourhood) -> list[tuple[int, int]]:
+    # empty cells close to the marks; rollouts on the unlimited board stay around the game
+    cells = set()
+    for row, col in engine.history:
+        for i in range(-neighbourhood, neighbourhood + 1):
+            for j in range(-neighbourhood, neighbourhood + 1):
+                if engine.mark_at(row + i, col + j) is None:
+                    cells.add((row + i, col + j))
+
+    return sorted(cells) if cells else [(0, 0)]
+
+
+def _winning_cell(engine: Engine, cells, mark) -> tuple[int, int] | None:
+    # an empty cell on which the mark completes a run of marks_needed_to_win, also by joining two runs
+    for row, col in cells:
+        for option in engine.lines.steps:
+            back, forward = engine.lines.potential_run(row, col, mark, option)
+            if back + 1 + forward >= engine.marks_needed_to_win:
+                return row, col
+    return None
+
+
+def _rollout(engine: Engine, neighbourhood, max_moves, rng: random.Random):
+    """
+    plays random moves near the marks and takes them back
+    :return: mark of the winner or None for an unfinished playout
+    """
+    if engine.is_over:
+        return engine.winner
+
+    cells = _near_cells(engine, neighbourhood)
+    seen = set(cells)
+    played = 0
+    winner = None
+    while cells and played < max_moves:
+        index = rng.randrange(len(cells))
+        cells[index], cells[-1] = cells[-1], cells[index]
+        row, col = cells.pop()
+        if engine.mark_at(row, col) is not None:
+            continue
+
+        result = engine.place(row, col)
+        played += 1
+        if result.is_win:
+            winner = result.mark
+            break
+
+        for i in range(-neighbourhood, neighbourhood + 1):
+            for j in range(-neighbourhood, neighbourhood + 1):
+                cell = row + i, col + j
+                if cell not in seen:
+                    seen.add(cell)
+                    cells.append(cell)
+
+    for _ in range(played):
+        engine.undo()
+
+    return winner
+
+
+def _rollouts_task(position: Position, count, neighbourhood, max_moves, seed) -> Counter:
+    engine = _rebuild(position)
+    rng = random.Random(seed)
+    return Counter(_rollout(engine, neighbourhood, max_moves, rng) for _ in range(count))
+
+
+def _search_task(position: Position, time_limit, neighbourhood, max_moves, exploration, seed) -> tuple[dict, int]:
+    engine = _rebuild(position)
+    tree = _Tree(engine, neighbourhood, exploration, random.Random(seed))
+    deadline = time.perf_counter() + time_limit
+    playouts = 0
+    while time.perf_counter() < deadline:
+        leaf, moves = tree.select()
+        tree.backup(leaf, _rollout(engine, neighbourhood, max_moves, tree.rng))
+        tree.take_back(moves)
+        playouts += 1
+
+    return tree.root_statistics(), playouts
+
+# </editor-fold>
+
+
+class _Node:
+    __slots__ = ("move", "mark", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, mark, parent, untried):
+        self.move = move
+        # mark of the player who made the move
+        self.mark = mark
+        self.parent = parent
+        self.children: list[_Node] = []
+        self.untried: list[tuple[int, int]] = untried
+        self.visits = 0
+        self.wins = 0.0
+
+    def uct_child(self, exploration) -> _Node:
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda node: node.wins / node.visits + exploration * math.sqrt(log_visits / node.visits)
+        )
+
+
+class _Tree:
+    def __init__(self, engine: Engine, neighbourhood, exploration, rng: random.Random):
+        self.engine = engine
+        self.neighbourhood = neighbourhood
+        self.exploration = exploration
+        self.rng = rng
+        self.root = _Node(None, None, None, _near_cells(engine, neighbourhood))
+
+    def select(self) -> tuple[_Node, int]:
+        """
+        walks down the tree playing its moves on the engine and expands one new node
+        :return: the new node and the number of moves played
+        """
+        node, moves = self.root, 0
+        while not node.untried and node.children and not self.engine.is_over:
+            node = node.uct_child(self.exploration)
+            self.engine.place(*node.move)
+            moves += 1
+
+        if node.untried and not self.engine.is_over:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            result = self.engine.place(*move)
+            moves += 1
+            untried = [] if result.is_win else _near_cells(self.engine, self.neighbourhood)
+            child = _Node(move, result.mark, node, untried)
+            node.children.append(child)
+            node = child
+
+        return node, moves
+
+    def take_back(self, moves):
+        for _ in range(moves):
+            self.engine.undo()
+
+    @staticmethod
+    def backup(node: _Node, winner, playouts=1, wins=None):
+        """
+        :param winner: mark of the winner of a single playout; None for unfinished one
+        :param wins: {winner: count} of several playouts, used instead of the winner
+        """
+        wins = wins if wins is not None else {winner: 1}
+        while node is not None:
+            node.visits += playouts
+            node.wins += wins.get(node.mark, 0) + 0.5 * wins.get(None, 0)
+            node = node.parent
+
+    def root_statistics(self) -> dict[tuple[int, int], tuple[int, float]]:
+        return {node.move: (node.visits, node.wins) for node in self.root.children}
+
+
+class MCTSStats:
+    def __init__(self, workers):
+        self.workers = workers
+        self.playouts = 0
+        self.elapsed = 0.0
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"{self.playouts} playouts on {self.workers} workers in {self.elapsed:.3f}s "
+                f"({self.playouts_per_second:.0f} playouts/s)")
+
+
+class MCTSPlayer:
+    parallelisms = ROOT, LEAF = "root", "leaf"
+
+    def __init__(self, time_limit=1.0, workers=None, parallelism=ROOT,
+                 neighbourhood=1, max_rollout_moves=60, exploration=1.4, rollouts_per_leaf=16, seed=None):
+        """
+        monte carlo tree search running its playouts in a pool of processes
+        :param time_limit: seconds per move
+        :param workers: number of processes; all cores by default
+        :param parallelism: "root" - every worker grows its own tree and the root statistics are merged,
+                            "leaf" - a single tree whose new leaves are played out by all workers at once
+        :param neighbourhood: moves are only made this close to a mark
+        :param max_rollout_moves: longer playouts count as a draw
+        :param rollouts_per_leaf: playouts of a leaf per worker with the leaf parallelism
+        """
+        if parallelism not in self.parallelisms:
+            raise ValueError("Invalid parallelism", parallelism)
+
+        self.time_limit = time_limit
+        self.workers = workers or os.cpu_count() or 1
+        self.parallelism = parallelism
+        self.neighbourhood = neighbourhood
+        self.max_rollout_moves = max_rollout_moves
+        self.exploration = exploration
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.rng = random.Random(seed)
+        self.stats = MCTSStats(self.workers)
+
+        self.__executor = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # spawned, so the workers don't inherit pygame from the game's process
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.__executor
+
+    def close(self):
+        if self.__executor is not None:
+            self.__executor.shutdown(cancel_futures=True)
+            self.__executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __seed(self) -> int:
+        return self.rng.getrandbits(64)
+
+    def __search_root(self, position: Position) -> dict[tuple[int, int], tuple[int, float]]:
+        futures = [
+            self.executor.submit(
+                _search_task, position, self.time_limit,
+                self.neighbourhood, self.max_rollout_moves, self.exploration, self.__seed())
+            for _ in range(self.workers)
+        ]
+
+        statistics = {}
+        for future in futures:
+            root_statistics, playouts = future.result()
+            self.stats.playouts += playouts
+            for move, (visits, wins) in root_statistics.items():
+                total_visits, total_wins = statistics.get(move, (0, 0.0))
+                statistics[move] = total_visits + visits, total_wins + wins
+
+        return statistics
+
+    def __search_leaf(self, engine: Engine, position: Position) -> dict[tuple[int, int], tuple[int, float]]:
+        marks_needed_to_win, marks, history = position
+        tree = _Tree(engine, self.neighbourhood, self.exploration, self.rng)
+        deadline = time.perf_counter() + self.time_limit
+        while time.perf_counter() < deadline:
+            leaf, moves = tree.select()
+            leaf_position = marks_needed_to_win, marks, list(engine.history)
+            tree.take_back(moves)
+
+            futures = [
+                self.executor.submit(
+                    _rollouts_task, leaf_position, self.rollouts_per_leaf,
+                    self.neighbourhood, self.max_rollout_moves, self.__seed())
+                for _ in range(self.workers)
+            ]
+            wins = Counter()
+            for future in futures:
+                wins += future.result()
+            playouts = self.rollouts_per_leaf * self.workers
+            # Counter drops zero counts, the number of playouts is passed on its own
+            tree.backup(leaf, None, playouts=playouts, wins=wins)
+            self.stats.playouts += playouts
+
+        return tree.root_statistics()
+
+    def choose_move(self, engine: Engine) -> tuple[int, int]:
+        """
+        searches the engine's position; the engine is left as it was
+        :return: (row, col) of the most visited move
+        """
+        start = time.perf_counter()
+        self.stats = MCTSStats(self.workers)
+        if not engine.history:
+            return 0, 0
+
+        # winning or forced moves don't need a search; random playouts rarely find the block in time
+        cells = _near_cells(engine, 1)
+        opponent = engine.marks[(engine.move_counter + 1) % 2]
+        for mark in (engine.current_mark, opponent):
+            forced = _winning_cell(engine, cells, mark)
+            if forced is not None:
+                self.stats.elapsed = time.perf_counter() - start
+                return forced
+
+        position = engine.marks_needed_to_win, engine.marks, list(engine.history)
+        if self.parallelism == MCTSPlayer.ROOT:
+            statistics = self.__search_root(position)
+        else:
+            statistics = self.__search_leaf(engine, position)
+        self.stats.elapsed = time.perf_counter() - start
+
+        if not statistics:
+            return _near_cells(engine, self.neighbourhood)[0]
+        return max(statistics, key=lambda move: statistics[move][0])
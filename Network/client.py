@@ -0,0 +1,50 @@
+import socket
+import threading
+
+from Network.protocol import JOIN, MOVE, NEW, VIEW, CLOSED, encode, decode
+
+
+class GameClient:
+    def __init__(self, host, port, on_message):
+        """
+        a blocking connection to a GameServer; the messages are read on a background thread
+        :param on_message: called on that thread with the command and the arguments of every message
+        """
+        self.socket = socket.create_connection((host, port))
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.on_message = on_message
+        self.__reader = threading.Thread(target=self.__read, daemon=True)
+        self.__reader.start()
+
+    def __read(self):
+        try:
+            with self.socket.makefile("rb") as lines:
+                for line in lines:
+                    command, args = decode(line)
+                    if command:
+                        self.on_message(command, args)
+        except OSError:
+            pass
+        self.on_message(CLOSED, [])
+
+    def send(self, command, *args):
+        self.socket.sendall(encode(command, *args))
+
+    def join(self, room, marks_needed_to_win):
+        self.send(JOIN, room, marks_needed_to_win)
+
+    def move(self, row, col):
+        self.send(MOVE, row, col)
+
+    def new_round(self):
+        self.send(NEW)
+
+    def view(self, row, col, rows, cols):
+        self.send(VIEW, row, col, rows, cols)
+
+    def close(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
@@ -0,0 +1,63 @@
+"""
+line protocol between the game server and its clients;
+every message is one line of space separated ascii words, the command first
+
+client --> server
+    JOIN <room> <marks needed to win>   joins a room, creating it with the given rule if needed
+    MOVE <row> <col>                    places the client's mark
+    NEW                                 starts a new round after a win
+    VIEW <row> <col> <rows> <cols>      asks for the marks in a part of the board
+
+server --> client
+    WELCOME <mark> <marks needed to win> <first mark> <second mark>
+                                        the client's mark ('-' for spectators) and the rules of the room,
+                                        followed by a MOVED message for every move of the current round
+    JOINED <mark>                       another player joined the room
+    LEFT <mark>                         a player left the room
+    MOVED <row> <col> <mark>            a mark was placed
+    WON <mark> <option> <row> <col> <length>
+                                        the last move won the round with the run starting at (row, col)
+    ROUND <first mark> <second mark>    a new round started
+    CELLS [<row> <col> <mark>]...       the marks asked for with VIEW
+    ERR <reason>                        the last command was rejected
+"""
+JOIN = "JOIN"
+MOVE = "MOVE"
+NEW = "NEW"
+VIEW = "VIEW"
+
+WELCOME = "WELCOME"
+JOINED = "JOINED"
+LEFT = "LEFT"
+MOVED = "MOVED"
+WON = "WON"
+ROUND = "ROUND"
+CELLS = "CELLS"
+ERR = "ERR"
+# never sent; the client passes it on when the connection ends
+CLOSED = "CLOSED"
+
+SPECTATOR = "-"
+DEFAULT_PORT = 7777
+
+
+def encode(command, *args) -> bytes:
+    return " ".join((command, *map(str, args))).encode() + b"\n"
+
+
+def decode(line: bytes) -> tuple[str, list[str]]:
+    """
+    :return: the command and its arguments; an empty command for a blank line
+    """
+    words = line.decode(errors="replace").split()
+    if not words:
+        return "", []
+    return words[0], words[1:]
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """
+    'host:port', 'host' or ':port'
+    """
+    host, _, port = address.rpartition(":") if ":" in address else (address, "", "")
+    return host or "127.0.0.1", int(port) if port else DEFAULT_PORT
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from engine import Engine
+from Network.protocol import (
+    JOIN, MOVE, NEW, VIEW, WELCOME, JOINED, LEFT, MOVED, WON, ROUND, CELLS, ERR, SPECTATOR,
+    encode, decode
+)
+
+log = logging.getLogger(__name__)
+
+
+class Session:
+    __slots__ = ("writer", "room", "mark")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        """
+        a connected client
+        """
+        self.writer = writer
+        self.room: Room | None = None
+        self.mark = None
+
+    def send(self, data: bytes):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+
+class Room:
+    def __init__(self, name, marks_needed_to_win):
+        """
+        a single game; the marks are kept in a byte per cell grid
+        """
+        self.name = name
+        self.engine = Engine(marks_needed_to_win, compact=True)
+        self.sessions: list[Session] = []
+
+    def free_mark(self):
+        taken = {session.mark for session in self.sessions}
+        for player in self.engine.players:
+            if player.mark not in taken:
+                return player.mark
+        return SPECTATOR
+
+    @property
+    def is_full(self) -> bool:
+        return self.free_mark() == SPECTATOR
+
+    def broadcast(self, data: bytes):
+        for session in self.sessions:
+            session.send(data)
+
+
+class ServerStats:
+    def __init__(self, history_size=10_000):
+        """
+        :param history_size: number of the last moves the latency percentiles are computed from
+        """
+        self.sessions = 0
+        self.rooms = 0
+        self.moves = 0
+        # seconds from reading a move to queueing its broadcast
+        self.move_latencies = deque(maxlen=history_size)
+
+    def percentile(self, p) -> float:
+        if not self.move_latencies:
+            return 0.0
+        latencies = sorted(self.move_latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+    def __repr__(self):
+        return (f"{self.sessions} sessions | {self.rooms} rooms | {self.moves} moves | "
+                f"move p50 {self.percentile(50) * 1e6:.0f} us, p99 {self.percentile(99) * 1e6:.0f} us")
+
+
+class GameServer:
+    def __init__(self, marks_needed_to_win=5, max_view=100):
+        """
+        hosts any number of independent rooms on a single asyncio loop
+        :param marks_needed_to_win: rule of the rooms whose creator didn't give one
+        :param max_view: longest side of the area a VIEW can ask for
+        """
+        self.marks_needed_to_win = marks_needed_to_win
+        self.max_view = max_view
+        self.rooms: dict[str, Room] = {}
+        self.stats = ServerStats()
+        self.commands = {
+            JOIN: self.__join,
+            MOVE: self.__move,
+            NEW: self.__new_round,
+            VIEW: self.__view,
+        }
+
+    # <editor-fold desc="Commands">
+    def __join(self, session: Session, room_name, marks_needed_to_win=None):
+        if session.room is not None:
+            raise ValueError("already in a room")
+
+        room = self.rooms.get(room_name)
+        if room is None:
+            marks_needed_to_win = int(marks_needed_to_win or self.marks_needed_to_win)
+            if marks_needed_to_win < 1:
+                raise ValueError("invalid marks needed to win")
+            room = self.rooms[room_name] = Room(room_name, marks_needed_to_win)
+            self.stats.rooms += 1
+
+        session.room, session.mark = room, room.free_mark()
+        room.broadcast(encode(JOINED, session.mark))
+        room.sessions.append(session)
+
+        engine = room.engine
+        session.send(encode(WELCOME, session.mark, engine.marks_needed_to_win, *engine.marks))
+        for i, (row, col) in enumerate(engine.history):
+            session.send(encode(MOVED, row, col, engine.marks[i % 2]))
+
+    def __move(self, session: Session, row, col):
+        room = self.__room_of(session)
+        engine = room.engine
+        if session.mark != engine.current_mark:
+            raise ValueError("not your turn")
+        if not room.is_full:
+            raise ValueError("waiting for an opponent")
+        if engine.is_over:
+            raise ValueError("round is over")
+
+        row, col = int(row), int(col)
+        if engine.mark_at(row, col) is not None:
+            raise ValueError("cell already taken")
+
+        result = engine.place(row, col)
+        room.broadcast(encode(MOVED, row, col, result.mark))
+        if result.is_win:
+            run = result.winning_run
+            room.broadcast(encode(WON, result.mark, run.option, *run.start, run.length))
+        self.stats.moves += 1
+
+    def __new_round(self, session: Session):
+        room = self.__room_of(session)
+        if not room.engine.is_over:
+            raise ValueError("round is not over")
+
+        room.engine.new_round()
+        room.broadcast(encode(ROUND, *room.engine.marks))
+
+    def __view(self, session: Session, row, col, rows, cols):
+        room = self.__room_of(session)
+        row, col, rows, cols = map(int, (row, col, rows, cols))
+        if not (0 < rows <= self.max_view and 0 < cols <= self.max_view):
+            raise ValueError("view too large")
+
+        # the chunks under the view are read at once
+        cells = []
+        for i, marks in enumerate(room.engine.grid.get_window(row, col, rows, cols)):
+            for j, mark in enumerate(marks):
+                if mark is not None:
+                    cells += (row + i, col + j, mark)
+        session.send(encode(CELLS, *cells))
+
+    @staticmethod
+    def __room_of(session: Session) -> Room:
+        if session.room is None:
+            raise ValueError("not in a room")
+        return session.room
+
+    # </editor-fold>
+
+    def __leave(self, session: Session):
+        room = session.room
+        if room is None:
+            return
+
+        room.sessions.remove(session)
+        room.broadcast(encode(LEFT, session.mark))
+        if not room.sessions:
+            del self.rooms[room.name]
+            self.stats.rooms -= 1
+
+    def handle_line(self, session: Session, line: bytes):
+        command, args = decode(line)
+        if not command:
+            return
+
+        if command not in self.commands:
+            session.send(encode(ERR, "unknown command", command))
+            return
+
+        start = time.perf_counter()
+        try:
+            self.commands[command](session, *args)
+        except (TypeError, ValueError) as error:
+            session.send(encode(ERR, *error.args[:1]))
+        else:
+            if command == MOVE:
+                self.stats.move_latencies.append(time.perf_counter() - start)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = Session(writer)
+        self.stats.sessions += 1
+        try:
+            async for line in reader:
+                self.handle_line(session, line)
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.__leave(session)
+            self.stats.sessions -= 1
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0) -> asyncio.Server:
+        """
+        :param port: 0 picks a free one; see server.sockets[0].getsockname()
+        """
+        return await asyncio.start_server(self.handle_client, host, port, backlog=1024)
+
+
+async def serve(host, port, marks_needed_to_win=5, stats_interval=10.0):
+    game_server = GameServer(marks_needed_to_win)
+    server = await game_server.start(host, port)
+    log.info("Serving on %s:%s", host, port)
+    async with server:
+        while True:
+            await asyncio.sleep(stats_interval)
+            log.info("%s", game_server.stats)
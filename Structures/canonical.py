@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+from typing import NamedTuple
+
+from engine import Engine
+from Structures.game_record import write_varint
+
+# the eight symmetries of a square (D4) as (row, col) --> (row, col)
+TRANSFORMS = (
+    lambda row, col: (row, col),
+    lambda row, col: (col, -row),
+    lambda row, col: (-row, -col),
+    lambda row, col: (-col, row),
+    lambda row, col: (row, -col),
+    lambda row, col: (-row, col),
+    lambda row, col: (col, row),
+    lambda row, col: (-col, -row),
+)
+# index of the transform taking every transform back
+INVERSES = tuple(
+    next(j for j, inverse in enumerate(TRANSFORMS) if inverse(*transform(1, 2)) == (1, 2))
+    for transform in TRANSFORMS
+)
+
+
+class Canonical(NamedTuple):
+    # 128-bit digest, the same in every process and on every platform
+    key: bytes
+    # the position is TRANSFORMS[transform] of the original moved by -offset
+    transform: int
+    offset: tuple[int, int]
+
+    def to_canonical(self, row, col) -> tuple[int, int]:
+        row, col = TRANSFORMS[self.transform](row, col)
+        return row - self.offset[0], col - self.offset[1]
+
+    def from_canonical(self, row, col) -> tuple[int, int]:
+        return TRANSFORMS[INVERSES[self.transform]](row + self.offset[0], col + self.offset[1])
+
+
+def canonicalize(cells, to_move, marks_needed_to_win) -> Canonical:
+    """
+    the same key for all the positions which differ only by a translation, a rotation or a reflection;
+    the marks are told apart only by whose turn it is, so swapped marks give the same key too
+    :param cells: ((row, col), mark) of every mark on the board
+    :param to_move: the mark of the player to move
+    """
+    cells = [(row, col, mark != to_move) for (row, col), mark in cells]
+    best = best_transform = best_offset = None
+    for index, transform in enumerate(TRANSFORMS):
+        moved = [(*transform(row, col), theirs) for row, col, theirs in cells]
+        top = min((row for row, _, _ in moved), default=0)
+        left = min((col for _, col, _ in moved), default=0)
+        shape = sorted((row - top, col - left, theirs) for row, col, theirs in moved)
+        if best is None or shape < best:
+            best, best_transform, best_offset = shape, index, (top, left)
+
+    data = bytearray()
+    write_varint(data, marks_needed_to_win)
+    # the shape starts at (0, 0), nothing is negative
+    for row, col, theirs in best:
+        write_varint(data, row)
+        write_varint(data, col << 1 | theirs)
+    return Canonical(hashlib.blake2b(data, digest_size=16).digest(), best_transform, best_offset)
+
+
+def canonicalize_engine(engine: Engine) -> Canonical:
+    return canonicalize(engine.occupied.items(), engine.current_mark, engine.marks_needed_to_win)
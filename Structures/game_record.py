@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import mmap
+import os
+from array import array
+from typing import Iterator, NamedTuple
+
+from engine import Engine
+
+MAGIC = b"UTTT\x01"
+
+
+# <editor-fold desc="Varint Coding">
+def zigzag(n: int) -> int:
+    # 0, -1, 1, -2, ... --> 0, 1, 2, 3, ...
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+def unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+def write_varint(buffer: bytearray, n: int):
+    while n > 0x7F:
+        buffer.append(n & 0x7F | 0x80)
+        n >>= 7
+    buffer.append(n)
+
+
+def read_varint(data, offset) -> tuple[int, int]:
+    """
+    :return: the number and the offset right after it
+    """
+    n = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, offset
+        shift += 7
+
+# </editor-fold>
+
+
+class GameRecord(NamedTuple):
+    marks_needed_to_win: int
+    # marks[0] made the first move
+    marks: tuple[str, str]
+    moves: list[tuple[int, int]]
+    winner: str | None = None
+
+    @classmethod
+    def from_engine(cls, engine: Engine) -> GameRecord:
+        """
+        the current round of the engine
+        """
+        return cls(engine.marks_needed_to_win, engine.marks, list(engine.history), engine.winner)
+
+    def encode(self) -> bytes:
+        """
+        varint length of the body, then the body:
+        marks needed to win, both marks, winner (0 - none, 1 or 2 - index of the mark + 1),
+        number of moves and zigzag varint (row, col) deltas from the previous move, the first one from (0, 0)
+        """
+        body = bytearray()
+        write_varint(body, self.marks_needed_to_win)
+        for mark in self.marks:
+            encoded = mark.encode()
+            write_varint(body, len(encoded))
+            body += encoded
+        body.append(0 if self.winner is None else self.marks.index(self.winner) + 1)
+
+        write_varint(body, len(self.moves))
+        last_row = last_col = 0
+        for row, col in self.moves:
+            write_varint(body, zigzag(row - last_row))
+            write_varint(body, zigzag(col - last_col))
+            last_row, last_col = row, col
+
+        record = bytearray()
+        write_varint(record, len(body))
+        return bytes(record + body)
+
+    @classmethod
+    def decode(cls, data, offset=0) -> tuple[GameRecord, int]:
+        """
+        :return: the record written by encode at the offset and the offset right after it
+        """
+        length, offset = read_varint(data, offset)
+        end = offset + length
+        marks_needed_to_win, offset = read_varint(data, offset)
+
+        marks = []
+        for _ in range(2):
+            mark_length, offset = read_varint(data, offset)
+            marks.append(bytes(data[offset:offset + mark_length]).decode())
+            offset += mark_length
+        winner = marks[data[offset] - 1] if data[offset] else None
+        move_count, offset = read_varint(data, offset + 1)
+
+        moves = []
+        row = col = 0
+        for _ in range(move_count):
+            d_row, offset = read_varint(data, offset)
+            d_col, offset = read_varint(data, offset)
+            row += unzigzag(d_row)
+            col += unzigzag(d_col)
+            moves.append((row, col))
+        return cls(marks_needed_to_win, (marks[0], marks[1]), moves, winner), end
+
+
+class RecordHeader(NamedTuple):
+    marks_needed_to_win: int
+    marks: tuple[str, str]
+    winner: str | None
+    move_count: int
+    # offset of the first move in the archive
+    moves_offset: int
+
+
+class ArchiveWriter:
+    def __init__(self, path):
+        """
+        appends games to an archive file;
+        offsets of the games are kept in a '<path>.idx' file of 64-bit integers
+        """
+        self.path = path
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            self.__repair_index()
+        self.data = open(path, "ab")
+        self.index = open(index_path(path), "ab")
+        if is_new:
+            self.data.write(MAGIC)
+
+    def __repair_index(self):
+        # an index which is missing or lost the last games would give the new games wrong numbers;
+        # the games after the last indexed one are found by walking over their lengths
+        with open(self.path, "rb") as file:
+            data = file.read()
+        offsets = array("Q")
+        if os.path.exists(index_path(self.path)):
+            with open(index_path(self.path), "rb") as index:
+                indexed = index.read()
+            offsets.frombytes(indexed[:len(indexed) // 8 * 8])
+            while offsets and record_end(data, offsets[-1]) is None:
+                offsets.pop()
+        else:
+            indexed = b""
+
+        offsets.extend(walk_offsets(data, record_end(data, offsets[-1]) if offsets else len(MAGIC)))
+        # a game cut off by a crash while it was written is dropped, the new ones go in its place
+        end = record_end(data, offsets[-1]) if offsets else len(MAGIC)
+        if end < len(data):
+            with open(self.path, "r+b") as file:
+                file.truncate(end)
+        if offsets.tobytes() != indexed:
+            with open(index_path(self.path), "wb") as index:
+                offsets.tofile(index)
+
+    def write(self, record: GameRecord) -> int:
+        """
+        :return: number of the game in the archive
+        """
+        offset = self.data.tell()
+        self.data.write(record.encode())
+        array("Q", [offset]).tofile(self.index)
+        return self.index.tell() // 8 - 1
+
+    def flush(self):
+        self.data.flush()
+        self.index.flush()
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArchiveReader:
+    def __init__(self, path):
+        """
+        random access to the games of an archive through a memory map; games are decoded only when read
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.path.getsize(path)
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size and self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a game archive", path)
+
+        self.offsets = self.__load_offsets(size)
+
+    def __load_offsets(self, size) -> array:
+        offsets = array("Q")
+        if os.path.exists(index_path(self.path)):
+            with open(index_path(self.path), "rb") as index:
+                offsets.frombytes(index.read())
+            # games written after the last index flush and a game cut off by a crash are dropped
+            while offsets and record_end(self.data, offsets[-1], size) is None:
+                offsets.pop()
+            return offsets
+
+        # no index: walks over the records using their lengths
+        return walk_offsets(self.data, len(MAGIC), size)
+
+    def header(self, i) -> RecordHeader:
+        data = self.data
+        _, offset = read_varint(data, self.offsets[i])
+        marks_needed_to_win, offset = read_varint(data, offset)
+
+        marks = []
+        for _ in range(2):
+            length, offset = read_varint(data, offset)
+            marks.append(bytes(data[offset:offset + length]).decode())
+            offset += length
+        winner = marks[data[offset] - 1] if data[offset] else None
+        move_count, offset = read_varint(data, offset + 1)
+
+        return RecordHeader(marks_needed_to_win, (marks[0], marks[1]), winner, move_count, offset)
+
+    def moves(self, i) -> Iterator[tuple[int, int]]:
+        """
+        streams the moves of a game straight from the map
+        """
+        header = self.header(i)
+        data, offset = self.data, header.moves_offset
+        row = col = 0
+        for _ in range(header.move_count):
+            d_row, offset = read_varint(data, offset)
+            d_col, offset = read_varint(data, offset)
+            row += unzigzag(d_row)
+            col += unzigzag(d_col)
+            yield row, col
+
+    def replay(self, i, engine: Engine = None) -> Engine:
+        """
+        plays the game on a new engine or on the given one, which should be at the start of a round
+        with the marks of the game
+        """
+        header = self.header(i)
+        if engine is None:
+            engine = Engine(header.marks_needed_to_win, marks=header.marks)
+        for row, col in self.moves(i):
+            engine.place(row, col)
+        return engine
+
+    def __getitem__(self, i) -> GameRecord:
+        header = self.header(i)
+        return GameRecord(header.marks_needed_to_win, header.marks, list(self.moves(i)), header.winner)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def index_path(path) -> str:
+    return f"{path}.idx"
+
+
+def record_end(data, offset, size=None) -> int | None:
+    """
+    :return: the offset right after the record or None if the data ends inside it, eg. after a crash
+    """
+    size = len(data) if size is None else size
+    try:
+        length, body = read_varint(data, offset)
+    except IndexError:
+        return None
+    return body + length if body + length <= size else None
+
+
+def walk_offsets(data, offset, size=None) -> array:
+    """
+    offsets of the records from the given one to the end, found by skipping over their lengths;
+    a record cut off at the end is left out
+    """
+    size = len(data) if size is None else size
+    offsets = array("Q")
+    while offset < size:
+        end = record_end(data, offset, size)
+        if end is None:
+            break
+        offsets.append(offset)
+        offset = end
+    return offsets
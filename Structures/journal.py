@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple
+
+from engine import Engine
+from Structures.game_record import GameRecord, read_varint, write_varint, zigzag, unzigzag
+
+log = logging.getLogger(__name__)
+
+JOURNAL_MAGIC = b"UTJ\x02"
+SNAPSHOT_MAGIC = b"UTS\x02"
+# the magic and the generation of the journal
+HEADER_SIZE = len(JOURNAL_MAGIC) + 8
+
+# record types
+MOVE, UNDO, RESULT, NEW_ROUND = range(1, 5)
+
+
+def default_journal_path() -> str:
+    data = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(data, "unlimited-tictactoe", "session.journal")
+
+
+def snapshot_path(path) -> str:
+    return f"{path}.snap"
+
+
+def journal_header(generation) -> bytes:
+    return JOURNAL_MAGIC + generation.to_bytes(8, "little")
+
+
+def _fsync_directory(path):
+    # makes a rename in the directory durable; directories can't be opened on windows
+    if os.name == "nt":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# <editor-fold desc="Records">
+def encode_record(kind, *numbers) -> bytes:
+    """
+    varint length of the body, the body - the kind and zigzag varint numbers - and its crc32;
+    a record cut off by a crash fails the check
+    """
+    body = bytearray([kind])
+    for n in numbers:
+        write_varint(body, zigzag(n))
+
+    record = bytearray()
+    write_varint(record, len(body))
+    record += body
+    record += zlib.crc32(body).to_bytes(4, "little")
+    return bytes(record)
+
+
+def read_records(data, offset=0) -> Iterator[tuple[int, list[int], int]]:
+    """
+    yields (kind, numbers, offset after the record) of the records up to the first broken one
+    """
+    while offset < len(data):
+        try:
+            length, body = read_varint(data, offset)
+        except IndexError:
+            return
+        end = body + length + 4
+        if end > len(data) or zlib.crc32(data[body:body + length]).to_bytes(4, "little") != data[end - 4:end]:
+            return
+
+        numbers = []
+        position = body + 1
+        while position < body + length:
+            n, position = read_varint(data, position)
+            numbers.append(unzigzag(n))
+        yield data[body], numbers, end
+        offset = end
+
+
+# </editor-fold>
+
+
+class SessionSnapshot(NamedTuple):
+    # generation of the journal continuing the snapshot; an older journal holds only records included in it
+    generation: int
+    # (mark, score) in the order of the engine's players
+    players: tuple[tuple[str, int], ...]
+    round: GameRecord
+
+    @classmethod
+    def from_engine(cls, engine: Engine, generation=0) -> SessionSnapshot:
+        players = tuple((player.mark, player.score) for player in engine.players)
+        return cls(generation, players, GameRecord.from_engine(engine))
+
+    def encode(self) -> bytes:
+        body = bytearray()
+        write_varint(body, self.generation)
+        for mark, score in self.players:
+            encoded = mark.encode()
+            write_varint(body, len(encoded))
+            body += encoded
+            write_varint(body, zigzag(score))
+        body += self.round.encode()
+        return SNAPSHOT_MAGIC + bytes(body) + zlib.crc32(body).to_bytes(4, "little")
+
+    @classmethod
+    def decode(cls, data: bytes) -> SessionSnapshot:
+        body = data[len(SNAPSHOT_MAGIC):-4]
+        if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or zlib.crc32(body).to_bytes(4, "little") != data[-4:]:
+            raise ValueError("Not a session snapshot")
+
+        generation, offset = read_varint(body, 0)
+        players = []
+        for _ in range(2):
+            length, offset = read_varint(body, offset)
+            mark = body[offset:offset + length].decode()
+            score, offset = read_varint(body, offset + length)
+            players.append((mark, unzigzag(score)))
+        record, _ = GameRecord.decode(body, offset)
+        return cls(generation, tuple(players), record)
+
+    def to_engine(self) -> Engine:
+        engine = Engine(self.round.marks_needed_to_win, marks=[mark for mark, _ in self.players])
+        engine.marks = self.round.marks
+        for row, col in self.round.moves:
+            engine.place(row, col)
+        # the win of the round is counted in the scores already
+        for player, (_, score) in zip(engine.players, self.players):
+            player.score = score
+        return engine
+
+
+class Journal:
+    def __init__(self, path, snapshot_every=256, flush_interval=0.05):
+        """
+        a crash-safe log of a session: the moves, undos and round results are appended to the file
+        by a background thread in batches, each batch fsynced; the caller only queues them;
+        every snapshot_every records the whole state is saved to '<path>.snap' and the journal starts again
+        with the next generation, so it stays short and resuming replays only the records after the snapshot
+        :param path: the journal; default_journal_path() keeps it in the user's data directory
+        :param flush_interval: seconds the records are collected before they are written together
+        """
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.flush_interval = flush_interval
+
+        self.engine: Engine | None = None
+        # generation of the newest snapshot; None without a resumed session
+        self.__generation: int | None = None
+        # end of the valid records found by resume; the journal is cut there before anything is appended,
+        # None if it's older than the snapshot and starts again
+        self.__end: int | None = None
+        self.__records = 0
+        self.__queue: queue.Queue = queue.Queue()
+        self.__thread: threading.Thread | None = None
+        self.__file = None
+        self.error: Exception | None = None
+
+    def resume(self, marks_needed_to_win=None) -> Engine | None:
+        """
+        the engine of the last session: the newest snapshot with the journal records after it replayed;
+        the cost doesn't grow with the length of the session, only with the current round
+        :param marks_needed_to_win: only a session played by these rules is resumed; any by default
+        :return: None if there is no saved session to resume
+        """
+        try:
+            with open(snapshot_path(self.path), "rb") as file:
+                snapshot = SessionSnapshot.decode(file.read())
+        except (OSError, ValueError):
+            return None
+        if marks_needed_to_win is not None and snapshot.round.marks_needed_to_win != marks_needed_to_win:
+            return None
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+        except OSError:
+            data = b""
+
+        engine = snapshot.to_engine()
+        self.__generation = snapshot.generation
+        # a crash after the snapshot but before the journal started again
+        if data[:HEADER_SIZE] != journal_header(snapshot.generation):
+            self.__end = None
+            return engine
+
+        end = HEADER_SIZE
+        try:
+            for kind, numbers, record_end in read_records(data, HEADER_SIZE):
+                if kind == MOVE:
+                    engine.place(*numbers)
+                elif kind == UNDO:
+                    engine.undo()
+                elif kind == NEW_ROUND:
+                    engine.new_round()
+                end = record_end
+        except ValueError:
+            # a record which doesn't fit the state; the ones after it are dropped
+            pass
+
+        self.__end = end
+        return engine
+
+    def start(self, engine: Engine):
+        """
+        starts appending to the journal the session of the engine, the resumed one or a new one;
+        without a resumed session the old journal is discarded
+        """
+        self.engine = engine
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        is_new = self.__generation is None
+        if is_new:
+            # the old snapshot doesn't match the new journal
+            if os.path.exists(snapshot_path(self.path)):
+                os.remove(snapshot_path(self.path))
+            self.__generation = 0
+
+        if self.__end is None:
+            self.__file = open(self.path, "wb")
+            self.__file.write(journal_header(self.__generation))
+        else:
+            # not in append mode: a torn record at the end is cut off first
+            self.__file = open(self.path, "r+b")
+            self.__file.truncate(self.__end)
+            self.__file.seek(self.__end)
+        if is_new:
+            self.snapshot()
+
+        self.__thread = threading.Thread(target=self.__write_loop, name="journal", daemon=True)
+        self.__thread.start()
+
+    # <editor-fold desc="Records">
+    def __append(self, record: bytes):
+        # nothing is written after an error
+        if self.error is not None:
+            return
+        self.__queue.put(record)
+        self.__records += 1
+        if self.__records >= self.snapshot_every:
+            self.snapshot()
+
+    def move(self, row, col):
+        self.__append(encode_record(MOVE, row, col))
+
+    def undo(self):
+        self.__append(encode_record(UNDO))
+
+    def result(self, winner_index):
+        """
+        :param winner_index: index of the winner's mark in the marks of the round; the replay finds the win itself
+        """
+        self.__append(encode_record(RESULT, winner_index))
+
+    def new_round(self):
+        self.__append(encode_record(NEW_ROUND))
+
+    def snapshot(self):
+        """
+        queues the current state; only the moves of the round are copied, the rest is encoded on the writer thread
+        """
+        self.__records = 0
+        if self.error is None:
+            self.__queue.put(SessionSnapshot.from_engine(self.engine))
+
+    # </editor-fold>
+
+    def __write_snapshot(self, snapshot: SessionSnapshot):
+        # the snapshot with the next generation is on the disk before the journal starts again;
+        # a crash in between leaves the journal of the previous generation, whose records are all in the snapshot
+        generation = self.__generation + 1
+        temporary = f"{snapshot_path(self.path)}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(snapshot._replace(generation=generation).encode())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, snapshot_path(self.path))
+        _fsync_directory(self.path)
+
+        self.__file.seek(0)
+        self.__file.truncate()
+        self.__file.write(journal_header(generation))
+        self.__generation = generation
+
+    def __write_loop(self):
+        stop = False
+        while not stop:
+            batch = [self.__queue.get()]
+            # clicks come one by one; whatever comes meanwhile is written with a single fsync
+            time.sleep(self.flush_interval)
+            while True:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for item in batch:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, SessionSnapshot):
+                        self.__write_snapshot(item)
+                    else:
+                        self.__file.write(item)
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+            except OSError as error:
+                # the game goes on without the journal
+                log.error("The session journal can't be written: %s", error)
+                self.error = error
+                return
+
+    def close(self) -> bool:
+        """
+        saves a snapshot, so the next start doesn't replay anything, and waits for the writes
+        :return: whether the session is saved; after a write error only the part before it is
+        """
+        if self.__thread is None:
+            return self.error is None
+        self.snapshot()
+        self.__queue.put(None)
+        self.__thread.join()
+        self.__thread = None
+        try:
+            self.__file.close()
+        except OSError:
+            # flushing the records of the failed write again
+            pass
+        if self.error is not None:
+            log.warning("The session wasn't saved, the journal ends before the error: %s", self.error)
+        return self.error is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,124 @@
+from typing import NamedTuple
+
+from consts import WinningOptions
+from Structures.unlimited_grid import UnlimitedGrid
+
+
+class Run(NamedTuple):
+    option: str
+    start: tuple[int, int]
+    length: int
+
+    @property
+    def cells(self) -> list[tuple[int, int]]:
+        (row, col), (d_row, d_col) = self.start, LineIndex.steps[self.option]
+        return [(row + i * d_row, col + i * d_col) for i in range(self.length)]
+
+
+class LineIndex:
+    # (row, col) step to the next cell of a line; cells of a run are ordered by it
+    steps = {
+        WinningOptions.horizontal: (0, 1),
+        WinningOptions.vertical: (1, 0),
+        WinningOptions.neg_diagonal: (1, 1),
+        WinningOptions.pos_diagonal: (-1, 1),
+    }
+
+    def __init__(self, new_grid=None):
+        """
+        keeps placed marks together with the lengths of their contiguous same-mark runs
+        in all four WinningOptions directions;
+        the length of a run is stored only at both of its ends, so placing a mark merges
+        the neighbour runs in constant time
+        :param new_grid: a callable creating an empty grid for the marks; UnlimitedGrid by default
+        """
+        self.new_grid = new_grid or UnlimitedGrid
+        self.grid = self.new_grid()
+        # one {end cell: run length} dict per direction
+        self.ends: dict[str, dict[tuple[int, int], int]] = {option: {} for option in self.steps}
+
+    def mark_at(self, row, col):
+        return self.grid[row, col]
+
+    def potential_run(self, row, col, mark, option) -> tuple[int, int]:
+        """
+        :return: lengths of the mark's runs right before and right after (row, col) in the direction;
+                 if (row, col) is empty, placing the mark there makes a run of back + 1 + forward
+        """
+        d_row, d_col = self.steps[option]
+        ends = self.ends[option]
+        back_cell = row - d_row, col - d_col
+        forward_cell = row + d_row, col + d_col
+        back = ends[back_cell] if self.grid[back_cell] == mark else 0
+        forward = ends[forward_cell] if self.grid[forward_cell] == mark else 0
+        return back, forward
+
+    def run_at(self, row, col, option) -> Run:
+        """
+        the run going through a placed mark;
+        constant time for the ends of a run, otherwise walks back to its start
+        """
+        d_row, d_col = self.steps[option]
+        ends = self.ends[option]
+        mark = self.grid[row, col]
+        if mark is None:
+            raise KeyError("No mark at", (row, col))
+
+        while (row, col) not in ends or self.grid[row - d_row, col - d_col] == mark:
+            row, col = row - d_row, col - d_col
+
+        return Run(option, (row, col), ends[row, col])
+
+    def place(self, row, col, mark) -> tuple[Run, ...]:
+        """
+        :return: the run through the new mark in every direction
+        """
+        if self.grid[row, col] is not None:
+            raise ValueError("Cell already taken", (row, col))
+
+        runs = []
+        for option, (d_row, d_col) in self.steps.items():
+            back, forward = self.potential_run(row, col, mark, option)
+            ends = self.ends[option]
+            length = back + 1 + forward
+            start = row - back * d_row, col - back * d_col
+            end = row + forward * d_row, col + forward * d_col
+
+            # the old inner ends are in the middle of the merged run now
+            if back > 1:
+                del ends[row - d_row, col - d_col]
+            if forward > 1:
+                del ends[row + d_row, col + d_col]
+            ends[start] = ends[end] = length
+
+            runs.append(Run(option, start, length))
+
+        self.grid[row, col] = mark
+        return tuple(runs)
+
+    def remove(self, row, col):
+        """
+        removes a placed mark splitting its runs; the cost is bounded by the length of the runs
+        """
+        for option, (d_row, d_col) in self.steps.items():
+            run = self.run_at(row, col, option)
+            ends = self.ends[option]
+            start_row, start_col = run.start
+            back = max(abs(row - start_row), abs(col - start_col))
+            forward = run.length - back - 1
+            end = row + forward * d_row, col + forward * d_col
+
+            ends.pop((row, col), None)
+            if back:
+                ends[run.start] = ends[row - d_row, col - d_col] = back
+            if forward:
+                ends[row + d_row, col + d_col] = ends[end] = forward
+
+        self.grid[row, col] = None
+
+    def clear(self):
+        self.grid = self.new_grid()
+        self.ends = {option: {} for option in self.steps}
+
+    def __len__(self):
+        return len(self.grid)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+
+class OccupancyIndex:
+    def __init__(self):
+        """
+        the occupied cells with their marks and the bounding box around them;
+        the box grows in constant time and is recomputed only after a cell on its edge is removed
+        """
+        self.cells: dict[tuple[int, int], str] = {}
+        self.__bounds: tuple[int, int, int, int] | None = None
+        self.__is_stale = False
+
+    def add(self, row, col, mark):
+        self.cells[row, col] = mark
+        if self.__is_stale:
+            return
+
+        if self.__bounds is None:
+            self.__bounds = row, col, row, col
+            return
+
+        top, left, bottom, right = self.__bounds
+        self.__bounds = min(top, row), min(left, col), max(bottom, row), max(right, col)
+
+    def remove(self, row, col):
+        del self.cells[row, col]
+        if self.__is_stale or self.__bounds is None:
+            return
+
+        top, left, bottom, right = self.__bounds
+        if row in (top, bottom) or col in (left, right):
+            self.__is_stale = True
+
+    def clear(self):
+        self.cells = {}
+        self.__bounds = None
+        self.__is_stale = False
+
+    @property
+    def bounds(self) -> tuple[int, int, int, int] | None:
+        """
+        :return: (top, left, bottom, right) of the occupied cells, all included; None if there are none
+        """
+        if self.__is_stale:
+            rows = [row for row, _ in self.cells]
+            cols = [col for _, col in self.cells]
+            self.__bounds = (min(rows), min(cols), max(rows), max(cols)) if self.cells else None
+            self.__is_stale = False
+        return self.__bounds
+
+    def items(self):
+        """
+        yields ((row, col), mark) of every occupied cell
+        """
+        return self.cells.items()
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        return key in self.cells
+
+    def __len__(self):
+        return len(self.cells)
@@ -1,6 +1,8 @@
 
 
 class Player:
+    __slots__ = ("mark", "score")
+
     def __init__(self, mark: str, score: int):
         """
         :param mark: representation of the player on the board. eg. 'X' or 'O'
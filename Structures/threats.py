@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from Structures.line_index import LineIndex
+from Structures.occupancy import OccupancyIndex
+
+
+class Threat(NamedTuple):
+    mark: str
+    option: str
+    start: tuple[int, int]
+    length: int
+    # empty cells right before and right after the run
+    ends: tuple[tuple[int, int], ...]
+
+    @property
+    def is_open(self) -> bool:
+        return len(self.ends) == 2
+
+    @property
+    def cells(self) -> list[tuple[int, int]]:
+        (row, col), (d_row, d_col) = self.start, LineIndex.steps[self.option]
+        return [(row + i * d_row, col + i * d_col) for i in range(self.length)]
+
+
+class ThreatIndex:
+    def __init__(self, lines: LineIndex, occupied: OccupancyIndex, marks_needed_to_win):
+        """
+        open and half-open runs one or two marks short of a win ("fours" and "threes" when five are needed)
+        of both players; a run counts only if it still has room to grow into a win;
+        kept up to date one changed cell at a time, so a move costs the same on any board
+        :param lines: the runs of the marks; the threats follow its changes through update
+        :param occupied: the same marks; reading a dict is cheaper than reading the grid
+        """
+        self.lines = lines
+        self.occupied = occupied
+        self.marks_needed_to_win = marks_needed_to_win
+        # (option, start of the run) -> threat
+        self.threats: dict[tuple[str, tuple[int, int]], Threat] = {}
+        # the same for the runs one mark short of a win only
+        self.fours: dict[tuple[str, tuple[int, int]], Threat] = {}
+
+    def __line(self, row, col, d_row, d_col, first, last) -> list:
+        # marks of the cells from first to last steps away from (row, col), both included
+        cells = self.occupied.cells
+        return [cells.get((row + i * d_row, col + i * d_col)) for i in range(first, last + 1)]
+
+    def __classify(self, option, start, length, mark, line, index) -> Threat | None:
+        # line holds the marks around the run, which starts at line[index]
+        k = self.marks_needed_to_win
+        if not max(2, k - 2) <= length <= k - 1:
+            return None
+
+        # cells which aren't the opponent's on both sides, up to the number still missing
+        missing = k - length
+        back = forward = 0
+        while back < missing and line[index - 1 - back] in (None, mark):
+            back += 1
+        while forward < missing and line[index + length + forward] in (None, mark):
+            forward += 1
+        if length + back + forward < k:
+            return None
+
+        # the cells next to a run aren't its mark, so they are empty when there is any room
+        d_row, d_col = LineIndex.steps[option]
+        row, col = start
+        ends = []
+        if back:
+            ends.append((row - d_row, col - d_col))
+        if forward:
+            ends.append((row + length * d_row, col + length * d_col))
+        return Threat(mark, option, start, length, tuple(ends))
+
+    def __add(self, key, threat: Threat):
+        self.threats[key] = threat
+        if threat.length == self.marks_needed_to_win - 1:
+            self.fours[key] = threat
+
+    def update(self, row, col):
+        """
+        called after a mark is placed on or removed from (row, col);
+        only the runs starting at most marks_needed_to_win cells away along the lines through it can change,
+        and all they depend on lies within twice that distance
+        """
+        k = self.marks_needed_to_win
+        for option, (d_row, d_col) in LineIndex.steps.items():
+            ends = self.lines.ends[option]
+            line = self.__line(row, col, d_row, d_col, -2 * k, 2 * k)
+            for i in range(-k, k + 1):
+                cell = row + i * d_row, col + i * d_col
+                key = option, cell
+                if self.threats.pop(key, None) is not None:
+                    self.fours.pop(key, None)
+
+                # only the first cell of a run is a key
+                index = i + 2 * k
+                mark = line[index]
+                if mark is None or line[index - 1] == mark:
+                    continue
+                threat = self.__classify(option, cell, ends[cell], mark, line, index)
+                if threat is not None:
+                    self.__add(key, threat)
+
+    def rebuild(self):
+        """
+        finds the threats of all the runs again; needed after marks_needed_to_win changes
+        """
+        self.clear()
+        k = self.marks_needed_to_win
+        cells = self.occupied.cells
+        for option, (d_row, d_col) in LineIndex.steps.items():
+            for (row, col), length in self.lines.ends[option].items():
+                mark = cells.get((row, col))
+                if mark is None or cells.get((row - d_row, col - d_col)) == mark:
+                    continue
+                missing = max(k - length, 0)
+                line = self.__line(row, col, d_row, d_col, -missing - 1, length + missing)
+                threat = self.__classify(option, (row, col), length, mark, line, missing + 1)
+                if threat is not None:
+                    self.__add((option, (row, col)), threat)
+
+    def clear(self):
+        self.threats = {}
+        self.fours = {}
+
+    def of(self, mark) -> list[Threat]:
+        return [threat for threat in self.threats.values() if threat.mark == mark]
+
+    def winning_cells(self, mark) -> set[tuple[int, int]]:
+        """
+        :return: the empty cells at the ends of the mark's fours; a mark placed on any of them wins
+        """
+        return {cell for threat in self.fours.values() if threat.mark == mark for cell in threat.ends}
+
+    def __iter__(self):
+        return iter(self.threats.values())
+
+    def __len__(self):
+        return len(self.threats)
@@ -1,6 +1,8 @@
 from consts import Direction
 from collections import deque
-from copy import copy
+from itertools import islice
+
+from instrumentation import metrics
 
 
 class UnlimitedGrid_queue:
@@ -15,64 +17,51 @@ class UnlimitedGrid_queue:
         self.get_obj = get_obj
         self.grid: deque = deque([deque([get_obj(row=0, col=0)])])
 
-        if start_data:
-            self.set_start_data(start_data)
-
         self.__lowest_row_index = 0
         self.__highest_row_index = 0
         self.__lowest_col_index = 0
         self.__highest_col_index = 0
 
-    def __get_actual_row(self, i):
-        # check boundary
-        # if doesn't exist --> extend self.grid
-        while i < self.__lowest_row_index:
+        if start_data:
+            self.set_start_data(start_data)
+
+    def __ensure(self, top, left, bottom, right):
+        # extends self.grid, so it covers rows top..bottom and cols left..right (included)
+        while top < self.__lowest_row_index:
             self.__extend(Direction.up)
-        while i > self.__highest_row_index:
+        while bottom > self.__highest_row_index:
             self.__extend(Direction.down)
-
-        return i - self.__lowest_row_index
-
-    def __get_actual_col(self, i):
-        # check boundary
-        # if doesn't exist --> extend self.grid
-        while i < self.__lowest_col_index:
+        while left < self.__lowest_col_index:
             self.__extend(Direction.left)
-        while i > self.__highest_col_index:
+        while right > self.__highest_col_index:
             self.__extend(Direction.right)
 
-        return i - self.__lowest_col_index
-
     def __extend(self, direction):
+        if metrics.enabled:
+            metrics.count("grid.extend")
+
+        cols = range(self.__lowest_col_index, self.__highest_col_index + 1)
         # insert row at the beginning
         if direction == Direction.up:
             self.__lowest_row_index -= 1
-            col = self.grid[0][0].col
-            self.grid.appendleft(
-                deque([self.get_obj(row=self.__lowest_row_index, col=i + col) for i in range(len(self.grid[0]))])
-            )
+            self.grid.appendleft(deque(self.get_obj(row=self.__lowest_row_index, col=col) for col in cols))
 
         # append get_obj row
         elif direction == Direction.down:
-            col = self.grid[self.__highest_row_index][0].col
             self.__highest_row_index += 1
-            self.grid.append(
-                deque([self.get_obj(row=self.__highest_row_index, col=col + i) for i in range(len(self.grid[0]))])
-            )
+            self.grid.append(deque(self.get_obj(row=self.__highest_row_index, col=col) for col in cols))
 
         # insert get_obj col at the beginning
         elif direction == Direction.left:
             self.__lowest_col_index -= 1
-            row = self.grid[0][0].row
-            for i in range(len(self.grid)):
-                self.grid[i].appendleft(self.get_obj(row=row + i, col=self.__lowest_col_index))
+            for i, row in enumerate(self.grid):
+                row.appendleft(self.get_obj(row=self.__lowest_row_index + i, col=self.__lowest_col_index))
 
         # append get_obj col
         elif direction == Direction.right:
             self.__highest_col_index += 1
-            row = self.grid[0][0].row
-            for i in range(len(self.grid)):
-                self.grid[i].append(self.get_obj(row=row + i, col=self.__highest_col_index))
+            for i, row in enumerate(self.grid):
+                row.append(self.get_obj(row=self.__lowest_row_index + i, col=self.__highest_col_index))
         else:
             raise ValueError("Invalid direction", direction)
 
@@ -81,9 +70,36 @@ class UnlimitedGrid_queue:
         for i in range(len(start_data)):
             self.grid.append(deque(start_data[i]))
 
+        self.__lowest_row_index = 0
+        self.__lowest_col_index = 0
         self.__highest_row_index = len(self.grid) - 1
         self.__highest_col_index = len(self.grid[0]) - 1
 
+    def get_window(self, row, col, height, width) -> list[list]:
+        """
+        eg. li = [[1, 2, 3], [4, 5, 6]]
+            returns -> [line[col:col + width] for line in li[row:row + height]]
+        the grid is extended once for the whole window
+        :param row, col: index of the top left cell
+        :return: list of rows, each a list of objects
+        """
+        if height <= 0 or width <= 0:
+            return [[] for _ in range(max(height, 0))]
+
+        self.__ensure(row, col, row + height - 1, col + width - 1)
+        first_row = row - self.__lowest_row_index
+        first_col = col - self.__lowest_col_index
+        return [
+            list(islice(self.grid[i], first_col, first_col + width))
+            for i in range(first_row, first_row + height)
+        ]
+
+    def get_block(self, top, left, bottom, right) -> list[list]:
+        """
+        :return: rows top..bottom and cols left..right, the ends excluded
+        """
+        return self.get_window(top, left, bottom - top, right - left)
+
     def get_row_range(self, row, start, end) -> list:
         """
         eg. li = [[1, 2, 3], [4, 5, 6]]
@@ -93,11 +109,7 @@ class UnlimitedGrid_queue:
         :param end: excluded index of the ending column number
         :return: list of objects
         """
-        row = self.__get_actual_row(row)
-        i = self.__get_actual_col(start)
-        j = self.__get_actual_col(end)
-
-        return [self.grid[row][i] for i in range(i, j)]
+        return self.get_window(row, start, 1, end - start)[0]
 
     def __repr__(self):
         return str([[sq for sq in row] for row in self.grid])
@@ -107,19 +119,16 @@ class UnlimitedGrid_queue:
         :param key: eg. grid[5, 6]
         """
         i, j = key
-        i = self.__get_actual_row(i)
-        j = self.__get_actual_col(j)
-        return self.grid[i][j]
+        self.__ensure(i, j, i, j)
+        return self.grid[i - self.__lowest_row_index][j - self.__lowest_col_index]
 
     def __setitem__(self, key: tuple[int, int], value):
         """
         :param key: eg. grid[5, 6]
         """
         i, j = key
-        i = self.__get_actual_row(i)
-        j = self.__get_actual_col(j)
-
-        self.grid[i][j] = value
+        self.__ensure(i, j, i, j)
+        self.grid[i - self.__lowest_row_index][j - self.__lowest_col_index] = value
 
     def __iter__(self):
         for row in self.grid:
@@ -130,83 +139,128 @@ class UnlimitedGrid_queue:
 
 
 class UnlimitedGrid:
-    def __init__(self, get_obj, start_data=None):
+    chunk_size = 16
+
+    def __init__(self, get_obj=None, start_data=None):
         """
-        a data structure represented in a 2D array of unlimited size (extends itself only when needed);
-        initially starts with (0, 0) index
+        a sparse data structure representing a 2D array of unlimited size;
+        cells are kept in fixed-size chunks stored in a dict keyed by chunk coordinates,
+        so memory grows with the number of used cells instead of the explored area
         uses negative indexes;
         eg. row=-1 --> one row before row=0
-        :param get_obj: a callable with 'row' and 'col' parameters; called to fill the grid with it
+        :param get_obj: a callable with 'row' and 'col' parameters; called lazily the first time
+                        a cell is accessed, a returned None is not stored; cells are empty by default
         """
-        self.get_obj = get_obj
-        self.grid = [[get_obj(row=0, col=0)]]
+        self.get_obj = get_obj or (lambda row, col: None)
+        # without get_obj the missing cells stay empty, reading them needn't call anything
+        self.fills_cells = get_obj is not None
+        self.chunks: dict[tuple[int, int], list] = {}
+        # number of stored cells in every chunk
+        self.__counts: dict[tuple[int, int], int] = {}
+        self.__size = 0
+
         if start_data:
             self.set_start_data(start_data)
 
-    @property
-    def __lowest_row(self):
-        return self.grid[0][0].row
-
-    @property
-    def __highest_row(self):
-        return self.grid[-1][-1].row
-
-    @property
-    def __lowest_col(self):
-        return self.grid[0][0].col
-
-    @property
-    def __highest_col(self):
-        return self.grid[-1][-1].col
-
-    def __get_actual_row(self, i):
-        # check boundary
-        # if doesn't exist --> extend self.grid
-        while i < self.__lowest_row:
-            self.__extend(Direction.up)
-        while i > self.__highest_row:
-            self.__extend(Direction.down)
-
-        return i - self.__lowest_row
-
-    def __get_actual_col(self, i):
-        # check boundary
-        # if doesn't exist --> extend self.grid
-        while i < self.__lowest_col:
-            self.__extend(Direction.left)
-        while i > self.__highest_col:
-            self.__extend(Direction.right)
-
-        return i - self.__lowest_col
-
-    def __extend(self, direction):
-        # insert row at the beginning
-        if direction == Direction.up:
-            new_row = [self.get_obj(row=el.row-1, col=el.col) for el in self.grid[0]]
-            self.grid.insert(0, new_row)
-
-        # append row to the end
-        elif direction == Direction.down:
-            new_row = [self.get_obj(row=el.row + 1, col=el.col) for el in self.grid[-1]]
-            self.grid.append(new_row)
-
-        # insert col at the beginning
-        elif direction == Direction.left:
-            for row in self.grid:
-                el = row[0]
-                row.insert(0, self.get_obj(row=el.row, col=el.col-1))
-
-        # append get_obj col
-        elif direction == Direction.right:
-            for row in self.grid:
-                el = row[-1]
-                row.append(self.get_obj(row=el.row, col=el.col+1))
-
-        else:
-            raise ValueError("Invalid direction", direction)
+    def __locate(self, i, j) -> tuple[tuple[int, int], int]:
+        # (chunk key, index inside the chunk)
+        # divmod floors, so negative indexes land in negative chunks
+        chunk_row, row = divmod(i, self.chunk_size)
+        chunk_col, col = divmod(j, self.chunk_size)
+        return (chunk_row, chunk_col), row * self.chunk_size + col
+
+    # <editor-fold desc="Chunk Storage">
+    # overridden by grids which keep their cells in another form than a list of objects
+    def _new_chunk(self):
+        return [None] * (self.chunk_size * self.chunk_size)
+
+    def _encode(self, value):
+        return value
+
+    def _decode(self, stored):
+        return stored
+
+    # </editor-fold>
+
+    def __store(self, chunk_key, index, value):
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None:
+            if value is None:
+                return
+            chunk = self.chunks[chunk_key] = self._new_chunk()
+            self.__counts[chunk_key] = 0
+            if metrics.enabled:
+                metrics.count("grid.chunk_allocations")
+
+        old = self._decode(chunk[index])
+        if old is None and value is not None:
+            self.__counts[chunk_key] += 1
+            self.__size += 1
+        elif old is not None and value is None:
+            self.__counts[chunk_key] -= 1
+            self.__size -= 1
+        chunk[index] = self._encode(value)
+
+        # drop chunks which became empty
+        if not self.__counts[chunk_key]:
+            del self.chunks[chunk_key]
+            del self.__counts[chunk_key]
 
     def set_start_data(self, start_data):
-        self.grid = [copy(row) for row in start_data]
+        self.chunks = {}
+        self.__counts = {}
+        self.__size = 0
+        for i, row in enumerate(start_data):
+            for j, obj in enumerate(row):
+                self[i, j] = obj
+
+    def get_window(self, row, col, height, width) -> list[list]:
+        """
+        eg. li = [[1, 2, 3], [4, 5, 6]]
+            returns -> [line[col:col + width] for line in li[row:row + height]]
+        every chunk under the window is looked up once and read by slices;
+        get_obj is called for the missing cells like when they're accessed one by one
+        :param row, col: index of the top left cell
+        :return: list of rows, each a list of objects
+        """
+        height, width = max(height, 0), max(width, 0)
+        window = [[None] * width for _ in range(height)]
+        if not width:
+            return window
+
+        size = self.chunk_size
+        for chunk_row in range(row // size, (row + height - 1) // size + 1):
+            top, bottom = max(row, chunk_row * size), min(row + height, (chunk_row + 1) * size)
+            for chunk_col in range(col // size, (col + width - 1) // size + 1):
+                chunk = self.chunks.get((chunk_row, chunk_col))
+                if chunk is None:
+                    continue
+
+                left, right = max(col, chunk_col * size), min(col + width, (chunk_col + 1) * size)
+                for i in range(top, bottom):
+                    # index of (i, 0) in the chunk
+                    offset = (i - chunk_row * size) * size - chunk_col * size
+                    window[i - row][left - col:right - col] = map(self._decode, chunk[offset + left:offset + right])
+
+        if not self.fills_cells:
+            return window
+
+        get_obj = self.get_obj
+        for i, line in enumerate(window):
+            for j, obj in enumerate(line):
+                if obj is None:
+                    obj = line[j] = get_obj(row=row + i, col=col + j)
+                    if obj is not None:
+                        if metrics.enabled:
+                            metrics.count("grid.get_obj_allocations")
+                        self.__store(*self.__locate(row + i, col + j), obj)
+        return window
+
+    def get_block(self, top, left, bottom, right) -> list[list]:
+        """
+        :return: rows top..bottom and cols left..right, the ends excluded
+        """
+        return self.get_window(top, left, bottom - top, right - left)
 
     def get_row_range(self, row, start, end) -> list:
         """
@@ -217,37 +271,86 @@ class UnlimitedGrid:
         :param end: excluded index of the ending column number
         :return: list of objects
         """
-        row = self.__get_actual_row(row)
-        i = self.__get_actual_col(start)
-        j = self.__get_actual_col(end)
+        return self.get_window(row, start, 1, end - start)[0]
 
-        return self.grid[row][i:j]
+    def items(self):
+        """
+        yields ((row, col), obj) of every stored cell; the order is unspecified
+        """
+        size = self.chunk_size
+        for (chunk_row, chunk_col), chunk in self.chunks.items():
+            for index, stored in enumerate(chunk):
+                obj = self._decode(stored)
+                if obj is not None:
+                    row, col = divmod(index, size)
+                    yield (chunk_row * size + row, chunk_col * size + col), obj
 
     def __repr__(self):
-        return str(self.grid)
+        return str(dict(self.items()))
+
+    def __contains__(self, key: tuple[int, int]) -> bool:
+        """
+        checks whether the cell is stored, without calling get_obj
+        """
+        chunk_key, index = self.__locate(*key)
+        chunk = self.chunks.get(chunk_key)
+        return chunk is not None and self._decode(chunk[index]) is not None
 
     def __getitem__(self, key: tuple[int, int]):
         """
         :param key: eg. grid[5, 6]
         """
         i, j = key
-        i = self.__get_actual_row(i)
-        j = self.__get_actual_col(j)
-        return self.grid[i][j]
+        chunk_key, index = self.__locate(i, j)
+        chunk = self.chunks.get(chunk_key)
+        if chunk is not None:
+            obj = self._decode(chunk[index])
+            if obj is not None:
+                return obj
+
+        obj = self.get_obj(row=i, col=j)
+        if obj is not None:
+            if metrics.enabled:
+                metrics.count("grid.get_obj_allocations")
+            self.__store(chunk_key, index, obj)
+        return obj
 
     def __setitem__(self, key: tuple[int, int], value):
         """
-        :param key: eg. grid[5, 6]
+        :param key: eg. grid[5, 6]; setting None removes the cell
         """
-        i, j = key
-        i = self.__get_actual_row(i)
-        j = self.__get_actual_col(j)
-
-        self.grid[i][j] = value
+        chunk_key, index = self.__locate(*key)
+        self.__store(chunk_key, index, value)
 
     def __iter__(self):
-        for row in self.grid:
-            yield row
+        for _, obj in self.items():
+            yield obj
 
     def __len__(self):
-        return len(self.grid)
+        return self.__size
+
+
+class UnlimitedByteGrid(UnlimitedGrid):
+    def __init__(self, values, get_obj=None, start_data=None):
+        """
+        an UnlimitedGrid keeping a single byte per cell; chunks are bytearrays
+        :param values: up to 255 distinct values the cells can hold, eg. the players' marks
+        :param get_obj: a callable with 'row' and 'col' parameters returning one of the values or None;
+                        cells are empty by default
+        """
+        if len(values) > 255:
+            raise ValueError("Too many values for a byte", len(values))
+
+        # byte 0 is an empty cell
+        self.values = (None, *values)
+        self.__codes = {value: code for code, value in enumerate(self.values)}
+        super().__init__(get_obj, start_data)
+
+    def _new_chunk(self):
+        return bytearray(self.chunk_size * self.chunk_size)
+
+    def _encode(self, value):
+        return self.__codes[value]
+
+    def _decode(self, stored):
+        return self.values[stored]
@@ -0,0 +1,40 @@
+MASK_64 = (1 << 64) - 1
+MASK_32 = (1 << 32) - 1
+
+
+def mix_64(x: int) -> int:
+    # splitmix64 finalizer
+    x = (x + 0x9E3779B97F4A7C15) & MASK_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return x ^ (x >> 31)
+
+
+class Zobrist:
+    def __init__(self, seed=0):
+        """
+        random 64-bit keys of (row, col, mark) for an unlimited board;
+        a key is derived from its cell, so it's the same in every process and doesn't need a table
+        built up front, it's only cached once used
+        """
+        self.seed = seed
+        self.keys: dict[tuple[int, int, str], int] = {}
+
+    def key(self, row, col, mark) -> int:
+        key = self.keys.get((row, col, mark))
+        if key is None:
+            cell = (row & MASK_32) << 32 | (col & MASK_32)
+            mark_bits = int.from_bytes(mark.encode(), "little")
+            key = self.keys[row, col, mark] = mix_64(mix_64(cell ^ self.seed) ^ mark_bits)
+        return key
+
+    def turn_key(self, mark, marks_needed_to_win) -> int:
+        """
+        a key of the player to move and the rule, for telling apart equal marks of different positions
+        """
+        key = self.keys.get((None, marks_needed_to_win, mark))
+        if key is None:
+            mark_bits = int.from_bytes(mark.encode(), "little")
+            key = self.keys[None, marks_needed_to_win, mark] = mix_64(
+                mix_64(~self.seed & MASK_64 ^ marks_needed_to_win) ^ mark_bits)
+        return key
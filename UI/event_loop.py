@@ -0,0 +1,168 @@
+import heapq
+import itertools
+import math
+import time
+
+import pygame
+
+
+class Task:
+    def __init__(self, due, callback, interval=None):
+        """
+        :param due: time.perf_counter() value after which the callback runs
+        :param interval: seconds between the runs of a repeated task; None runs it once
+        """
+        self.due = due
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class LoopStats:
+    def __init__(self):
+        """
+        wake-ups, drawn frames and cpu usage of the loop, averaged between the samples
+        """
+        self.wakeups = 0
+        self.frames = 0
+
+        self.wakeups_per_second = 0.0
+        self.frames_per_second = 0.0
+        self.cpu_percent = 0.0
+        self.is_active = False
+
+        self.__last_wall = time.perf_counter()
+        self.__last_cpu = time.process_time()
+
+    def sample(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        elapsed = wall - self.__last_wall
+        if elapsed <= 0:
+            return
+
+        self.wakeups_per_second = self.wakeups / elapsed
+        self.frames_per_second = self.frames / elapsed
+        self.cpu_percent = 100 * (cpu - self.__last_cpu) / elapsed
+
+        self.wakeups = self.frames = 0
+        self.__last_wall, self.__last_cpu = wall, cpu
+
+    def __repr__(self):
+        mode = "active" if self.is_active else "idle"
+        return (f"{self.frames_per_second:.0f} fps | {self.wakeups_per_second:.0f} wakeups/s | "
+                f"cpu {self.cpu_percent:.1f}% | {mode}")
+
+
+class EventLoop:
+    def __init__(self, fps=60):
+        """
+        blocks on pygame.event.wait while idle;
+        runs at a steady frame rate only while there are animations
+        :param fps: frame rate while animating
+        """
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.stats = LoopStats()
+        self.running = False
+
+        # heap of (due, order, task)
+        self.__tasks: list[tuple[float, int, Task]] = []
+        self.__order = itertools.count()
+        # callables taking the seconds since the last frame; an animation ends when it returns False
+        self.__animations = []
+        self.__last_frame = time.perf_counter()
+
+    # <editor-fold desc="Scheduling">
+    def __push(self, task: Task) -> Task:
+        heapq.heappush(self.__tasks, (task.due, next(self.__order), task))
+        return task
+
+    def call_later(self, delay, callback) -> Task:
+        return self.__push(Task(time.perf_counter() + delay, callback))
+
+    def call_every(self, interval, callback) -> Task:
+        return self.__push(Task(time.perf_counter() + interval, callback, interval))
+
+    def animate(self, animation):
+        """
+        :param animation: called every frame with the seconds since the last one, until it returns False
+        """
+        if not self.__animations:
+            self.__last_frame = time.perf_counter()
+        self.__animations.append(animation)
+
+    # </editor-fold>
+
+    # <editor-fold desc="Private Methods">
+    def __wait_for_events(self) -> list:
+        # sleeps until an event comes or the next task is due
+        while self.__tasks and self.__tasks[0][2].cancelled:
+            heapq.heappop(self.__tasks)
+
+        if not self.__tasks:
+            return [pygame.event.wait()]
+
+        timeout = math.ceil((self.__tasks[0][0] - time.perf_counter()) * 1000)
+        if timeout <= 0:
+            return pygame.event.get()
+
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event, *pygame.event.get()]
+
+    def __run_due_tasks(self):
+        now = time.perf_counter()
+        while self.__tasks and self.__tasks[0][0] <= now:
+            _, _, task = heapq.heappop(self.__tasks)
+            if task.cancelled:
+                continue
+
+            task.callback()
+            if task.interval is not None and not task.cancelled:
+                task.due = max(task.due + task.interval, now)
+                self.__push(task)
+
+    def __run_animations(self):
+        if not self.__animations:
+            return
+
+        now = time.perf_counter()
+        elapsed, self.__last_frame = now - self.__last_frame, now
+        self.__animations = [animation for animation in self.__animations if animation(elapsed) is not False]
+
+    def __draw(self, draw):
+        if draw():
+            self.stats.frames += 1
+
+    # </editor-fold>
+
+    def run(self, handle_event, draw):
+        """
+        :param handle_event: called with every pygame event
+        :param draw: called after the events and the tasks; returns whether it updated the screen
+        """
+        self.running = True
+        while self.running:
+            self.stats.is_active = bool(self.__animations)
+            if self.stats.is_active:
+                self.clock.tick(self.fps)
+                events = pygame.event.get()
+            else:
+                events = self.__wait_for_events()
+            self.stats.wakeups += 1
+
+            for event in events:
+                handle_event(event)
+            # the reaction to the input is shown before any task starts
+            self.__draw(draw)
+
+            self.__run_due_tasks()
+            self.__run_animations()
+            self.__draw(draw)
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,40 @@
+from UI.base_object import BaseObject
+from instrumentation import Metrics
+
+
+class MetricsOverlay(BaseObject):
+    def __init__(self,
+                 window, renderer,
+                 x, y, width, height,
+                 font,
+                 bg_color, fg_color,
+                 metrics: Metrics):
+        """
+        a panel with the counters and the timings of the instrumented code, drawn over the board
+        """
+        super().__init__(window, x, y, width, height)
+        self.renderer = renderer
+
+        self.font = font
+        self.fg_color = fg_color
+        self.bg_color = bg_color
+
+        self.metrics = metrics
+        self.visible = False
+
+    def toggle(self):
+        self.visible ^= True
+        if self.visible:
+            self.draw()
+
+    def draw(self):
+        if not self.visible:
+            return
+
+        self.window.fill(self.bg_color, (self.x, self.y, self.width, self.height))
+        line_height = self.font.get_linesize()
+        lines = self.metrics.summary() or ["nothing recorded yet"]
+        for i, line in enumerate(lines[:self.height // line_height]):
+            text = self.font.render(line, True, self.fg_color)
+            self.window.blit(text, (self.x, self.y + i * line_height))
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
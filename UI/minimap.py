@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+
+import pygame
+
+from UI.base_object import BaseObject
+
+
+class Minimap(BaseObject):
+    def __init__(self,
+                 window, renderer,
+                 x, y, width, height,
+                 bg_color, fg_color, view_color, mark_colors: dict,
+                 engine, board,
+                 max_scale=8):
+        """
+        every placed mark as a dot, together with the part of the board which is shown;
+        drawn from the engine's occupancy index, so its cost grows with the number of marks only
+        :param mark_colors: {mark: color}
+        :param max_scale: largest number of pixels per cell
+        """
+        super().__init__(window, x, y, width, height)
+        self.renderer = renderer
+        self.engine = engine
+        self.board = board
+
+        self.bg_color = bg_color
+        self.fg_color = fg_color
+        self.view_color = view_color
+        self.mark_colors = mark_colors
+        self.max_scale = max_scale
+
+        self.surface = pygame.Surface(self.size)
+        self.visible = False
+
+        # cell shown at the top left pixel and pixels per cell, both of the last draw
+        self.__origin = 0.0, 0.0
+        self.__scale = 1.0
+
+    def __area(self) -> tuple[int, int, int, int]:
+        # (top, left, bottom, right) of the marks and the shown part of the board
+        n = self.board.showed_grid_size
+        top, left = self.board.tracker.row, self.board.tracker.col
+        bottom, right = top + n - 1, left + n - 1
+        bounds = self.engine.occupied.bounds
+        if bounds is None:
+            return top, left, bottom, right
+        return min(top, bounds[0]), min(left, bounds[1]), max(bottom, bounds[2]), max(right, bounds[3])
+
+    def __to_pixel(self, row, col) -> tuple[int, int]:
+        origin_row, origin_col = self.__origin
+        return int((col - origin_col) * self.__scale), int((row - origin_row) * self.__scale)
+
+    def toggle(self):
+        self.visible ^= True
+        self.draw()
+
+    def draw(self):
+        if not self.visible:
+            return
+
+        top, left, bottom, right = self.__area()
+        rows, cols = bottom - top + 1, right - left + 1
+        self.__scale = scale = min(self.width / cols, self.height / rows, self.max_scale)
+        # the area is centered
+        self.__origin = top - (self.height / scale - rows) / 2, left - (self.width / scale - cols) / 2
+
+        self.surface.fill(self.bg_color)
+        dot = max(1, int(scale))
+        colors = {mark: self.surface.map_rgb(color) for mark, color in self.mark_colors.items()}
+        pixels = pygame.PixelArray(self.surface)
+        for (row, col), mark in self.engine.occupied.items():
+            x, y = self.__to_pixel(row, col)
+            pixels[x:x + dot, y:y + dot] = colors[mark]
+        pixels.close()
+
+        n = self.board.showed_grid_size
+        view_x, view_y = self.__to_pixel(self.board.tracker.row, self.board.tracker.col)
+        view_size = max(2, round(n * scale))
+        pygame.draw.rect(self.surface, self.view_color, (view_x, view_y, view_size, view_size), 1)
+        pygame.draw.rect(self.surface, self.fg_color, ((0, 0), self.size), 1)
+
+        self.window.blit(self.surface, self.pos)
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
+
+    def cell_at(self, x, y) -> tuple[int, int] | None:
+        """
+        :return: (row, col) of the cell under a point of the minimap or None if it's outside
+        """
+        if not self.visible or not self.check_collision(x, y):
+            return None
+
+        origin_row, origin_col = self.__origin
+        return (math.floor(origin_row + (y - self.y) / self.__scale),
+                math.floor(origin_col + (x - self.x) / self.__scale))
@@ -0,0 +1,87 @@
+import os
+
+import pygame
+
+
+def default_font_paths_file() -> str:
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "unlimited-tictactoe", "fonts.txt")
+
+
+class RenderCache:
+    def __init__(self, font_paths_file=None):
+        """
+        reusable fonts, rendered texts and pre-drawn layers;
+        entries are keyed by everything they depend on (text, font, sizes, colors),
+        so eg. swapped marks or a new square size never get a stale surface
+        :param font_paths_file: the files of the system fonts found in the previous runs;
+                                finding a font scans all the font directories, which is slow
+        """
+        self.font_paths_file = font_paths_file or default_font_paths_file()
+        # font name -> its file or None for pygame's default font; read with the first font
+        self.font_paths: dict[str, str | None] | None = None
+        self.fonts: dict[tuple[str, int], pygame.font.Font] = {}
+        self.texts: dict[tuple[pygame.font.Font, str, tuple], pygame.Surface] = {}
+        self.layers: dict[tuple, pygame.Surface] = {}
+
+    # <editor-fold desc="Font Paths">
+    def __load_font_paths(self) -> dict[str, str | None]:
+        # a line per font: name, tab, path; an empty path for the missing ones
+        try:
+            with open(self.font_paths_file, encoding="utf-8") as file:
+                return {name: path or None for name, _, path in (line.rstrip("\n").partition("\t") for line in file)}
+        except OSError:
+            return {}
+
+    def __save_font_paths(self):
+        temporary = f"{self.font_paths_file}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.font_paths_file), exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as file:
+                for name, path in self.font_paths.items():
+                    file.write(f"{name}\t{path or ''}\n")
+            os.replace(temporary, self.font_paths_file)
+        except OSError:
+            # eg. a read-only home; the fonts are found again the next time
+            pass
+
+    def font_path(self, name) -> str | None:
+        """
+        :return: the file of a system font or None if it isn't installed
+        """
+        if self.font_paths is None:
+            self.font_paths = self.__load_font_paths()
+
+        path = self.font_paths.get(name, "")
+        # unknown or removed since
+        if path == "" or path is not None and not os.path.exists(path):
+            path = self.font_paths[name] = pygame.font.match_font(name)
+            self.__save_font_paths()
+        return path
+
+    # </editor-fold>
+
+    def font(self, name, size) -> pygame.font.Font:
+        key = name, size
+        if key not in self.fonts:
+            # pygame's default font stands in for a missing one, as with SysFont
+            self.fonts[key] = pygame.font.Font(self.font_path(name), size)
+        return self.fonts[key]
+
+    def text(self, font: pygame.font.Font, text, color) -> pygame.Surface:
+        key = font, text, tuple(color)
+        if key not in self.texts:
+            self.texts[key] = font.render(text, True, color)
+        return self.texts[key]
+
+    def layer(self, key: tuple, size, draw) -> pygame.Surface:
+        """
+        :param key: everything the layer depends on
+        :param size: (width, height) of the layer
+        :param draw: a callable drawing the layer on the given surface; called only once per key
+        """
+        if key not in self.layers:
+            surface = pygame.Surface(size)
+            draw(surface)
+            self.layers[key] = surface
+        return self.layers[key]
@@ -0,0 +1,60 @@
+import time
+from collections import deque
+
+import pygame
+
+from instrumentation import metrics
+from UI.render_cache import RenderCache
+
+
+class Renderer:
+    def __init__(self, window, history_size=120):
+        """
+        collects the areas drawn during a frame and pushes them to the screen at once
+        :param window: the display surface
+        :param history_size: number of the last frame times kept
+        """
+        self.window = window
+        self.cache = RenderCache()
+        self.dirty: list[pygame.Rect] = []
+        self.frame_times = deque(maxlen=history_size)
+        self.__frame_start = None
+
+    @property
+    def last_frame_time(self) -> float:
+        return self.frame_times[-1] if self.frame_times else 0.0
+
+    def add_dirty(self, rect):
+        """
+        :param rect: changed area of the window; anything pygame.Rect accepts
+        """
+        rect = pygame.Rect(rect).clip(self.window.get_rect())
+        if not rect:
+            return
+
+        if self.__frame_start is None:
+            self.__frame_start = time.perf_counter()
+
+        # already covered by a bigger update
+        if any(dirty.contains(rect) for dirty in self.dirty):
+            return
+        # replaces the smaller ones it covers
+        self.dirty = [dirty for dirty in self.dirty if not rect.contains(dirty)]
+        self.dirty.append(rect)
+
+    def flush(self) -> bool:
+        """
+        ends the frame; updates only the dirty parts of the screen
+        :return: whether anything was updated
+        """
+        if not self.dirty:
+            return False
+
+        with metrics.timed("display.update"):
+            pygame.display.update(self.dirty)
+        self.dirty = []
+        self.frame_times.append(time.perf_counter() - self.__frame_start)
+        if metrics.enabled:
+            metrics.add_frame(self.frame_times[-1])
+        self.__frame_start = None
+        return True
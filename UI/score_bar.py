@@ -1,17 +1,16 @@
-import pygame
-
 from UI.base_object import BaseObject
 from Structures.player import Player
 
 
 class ScoreBar(BaseObject):
     def __init__(self,
-                 window,
+                 window, renderer,
                  x, y, width, height,
                  font,
                  bg_color, fg_color,
                  players: tuple[Player, Player]):
         super().__init__(window, x, y, width, height)
+        self.renderer = renderer
 
         self.font = font
         self.fg_color = fg_color
@@ -20,11 +19,12 @@ class ScoreBar(BaseObject):
         self.players = players
 
     def __draw_players(self):
-        text = self.font.render(self.players[0].mark, True, self.fg_color)
+        # marks don't change, so they're rendered only once
+        text = self.renderer.cache.text(self.font, self.players[0].mark, self.fg_color)
         x, y = self.x, self.y
         self.window.blit(text, (x, y))
 
-        text = self.font.render(self.players[-1].mark, True, self.fg_color)
+        text = self.renderer.cache.text(self.font, self.players[-1].mark, self.fg_color)
         x, y = self.x + self.width - text.get_width(), self.y
         self.window.blit(text, (x, y))
 
@@ -34,6 +34,8 @@ class ScoreBar(BaseObject):
         self.window.blit(text, (x, y))
 
     def draw(self):
+        # the old score is covered, it's redrawn after undos and new rounds
+        self.window.fill(self.bg_color, (self.x, self.y, self.width, self.height))
         self.__draw_score()
         self.__draw_players()
-        pygame.display.update()
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
@@ -0,0 +1,31 @@
+from UI.base_object import BaseObject
+from UI.event_loop import LoopStats
+
+
+class StatsOverlay(BaseObject):
+    def __init__(self,
+                 window, renderer,
+                 x, y, width, height,
+                 font,
+                 bg_color, fg_color,
+                 stats: LoopStats):
+        super().__init__(window, x, y, width, height)
+        self.renderer = renderer
+
+        self.font = font
+        self.fg_color = fg_color
+        self.bg_color = bg_color
+
+        self.stats = stats
+        self.visible = False
+
+    def toggle(self):
+        self.visible ^= True
+        self.draw()
+
+    def draw(self):
+        self.window.fill(self.bg_color, (self.x, self.y, self.width, self.height))
+        if self.visible:
+            text = self.font.render(str(self.stats), True, self.fg_color)
+            self.window.blit(text, (self.x, self.y + (self.height - text.get_height()) / 2))
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
@@ -0,0 +1,68 @@
+import pygame
+
+from UI.base_object import BaseObject
+
+
+class ThreatOverlay(BaseObject):
+    def __init__(self,
+                 window, renderer,
+                 engine, board,
+                 mark_colors: dict, fg_color):
+        """
+        hints over the shown squares: the empty cells extending a player's threat are framed in its color,
+        boldly for the fours, thinly for the threes
+        :param mark_colors: {mark: color}; fg_color for the missing ones
+        """
+        super().__init__(window, board.x, board.y, board.width, board.height)
+        self.renderer = renderer
+        self.engine = engine
+        self.board = board
+
+        self.mark_colors = mark_colors
+        self.fg_color = fg_color
+        self.visible = False
+
+        # cells framed by the last draw
+        self.__framed: set[tuple[int, int]] = set()
+
+    def toggle(self):
+        self.visible ^= True
+        if self.visible:
+            self.engine.track_threats()
+            self.draw()
+        else:
+            self.clear()
+
+    def clear(self):
+        # the framed squares are drawn again; the board may have moved since, the cells are looked up again
+        for row, col in self.__framed:
+            square = self.board.get_square(row, col)
+            if square is None:
+                continue
+            self.board.erase_mark(square)
+            if square.is_clicked:
+                self.board.draw_mark(square)
+        self.__framed = set()
+
+    def draw(self):
+        if not self.visible:
+            return
+
+        self.clear()
+        threats = self.engine.threats
+        four = self.engine.marks_needed_to_win - 1
+        # a cell ending a four and a three is framed as a four
+        frames = {}
+        for threat in sorted(threats, key=lambda threat: threat.length):
+            for cell in threat.ends:
+                if self.board.is_visible(*cell):
+                    frames[cell] = threat
+
+        size = self.board.square_size
+        for (row, col), threat in frames.items():
+            x, y = self.board.get_square_pos(row, col)
+            width = max(size // 8, 2) if threat.length == four else max(size // 24, 1)
+            color = self.mark_colors.get(threat.mark, self.fg_color)
+            # the frame is inside the square, so the grid lines stay as they are
+            self.renderer.add_dirty(pygame.draw.rect(self.window, color, (x, y, size, size), width))
+            self.__framed.add((row, col))
@@ -0,0 +1,67 @@
+"""
+the cost of journaling a click and the time to resume sessions of growing length
+
+usage: python -m benchmarks.journal
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from engine import Engine
+from Structures.journal import Journal, snapshot_path
+
+
+def play(engine: Engine, journal: Journal, rng: random.Random, clicks) -> list[float]:
+    """
+    random moves in short rounds, journaled as the game does it
+    :return: seconds spent in the journal per click
+    """
+    latencies = []
+    for _ in range(clicks):
+        if engine.is_over:
+            engine.new_round()
+            start = time.perf_counter()
+            journal.new_round()
+        else:
+            row, col = rng.randint(-5, 5), rng.randint(-5, 5)
+            if engine.mark_at(row, col) is not None:
+                continue
+            result = engine.place(row, col)
+            start = time.perf_counter()
+            journal.move(row, col)
+            if result.is_win:
+                journal.result(engine.marks.index(result.mark))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.journal")
+        journal = Journal(path)
+        engine = Engine(marks_needed_to_win=4)
+        journal.start(engine)
+
+        played = 0
+        for clicks in (1_000, 10_000, 100_000):
+            latencies = play(engine, journal, rng, clicks - played)
+            played = clicks
+            # the journal starts again after every snapshot, the largest it gets is snapshot_every records
+            journal.close()
+
+            start = time.perf_counter()
+            journal = Journal(path)
+            engine = journal.resume()
+            resume = time.perf_counter() - start
+            journal.start(engine)
+            print(f"  {clicks:>7} clicks  snapshot {os.path.getsize(snapshot_path(path)):6} B  "
+                  f"click {statistics.median(latencies) * 1e6:5.1f} us median, {max(latencies) * 1e3:5.2f} ms max  "
+                  f"resume {resume * 1e3:6.2f} ms")
+        journal.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+memory of a fully explored 1000x1000 area in the different cell representations
+
+usage: python -m benchmarks.memory
+"""
+import gc
+import tracemalloc
+
+from Structures.unlimited_grid import UnlimitedGrid, UnlimitedByteGrid
+from square import Square
+
+MARKS = "O", "X"
+
+
+class _DictSquare:
+    # a cell as the grid used to keep it: an object with a __dict__ for every explored cell
+    def __init__(self, row=0, col=0, x=0, y=0):
+        self.row = row
+        self.col = col
+        self.x = x
+        self.y = y
+        self.is_clicked = False
+        self.mark = None
+
+
+def dict_squares(size):
+    grid = UnlimitedGrid(lambda row, col: _DictSquare(row=row, col=col))
+    for row in range(size):
+        for col in range(size):
+            grid[row, col].mark = MARKS[(row + col) % 2]
+    return grid
+
+
+def slotted_squares(size):
+    grid = UnlimitedGrid(lambda row, col: Square(None, row=row, col=col))
+    for row in range(size):
+        for col in range(size):
+            grid[row, col].mark = MARKS[(row + col) % 2]
+    return grid
+
+
+def mark_references(size):
+    grid = UnlimitedGrid(lambda row, col: None)
+    for row in range(size):
+        for col in range(size):
+            grid[row, col] = MARKS[(row + col) % 2]
+    return grid
+
+
+def mark_bytes(size):
+    grid = UnlimitedByteGrid(MARKS)
+    for row in range(size):
+        for col in range(size):
+            grid[row, col] = MARKS[(row + col) % 2]
+    return grid
+
+
+def measure(build, size) -> int:
+    gc.collect()
+    tracemalloc.start()
+    grid = build(size)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del grid
+    return current
+
+
+def main(size=1000):
+    print(f"{size}x{size} cells, every one of them holding a mark")
+    baseline = None
+    for name, build in (
+            ("Square with __dict__", dict_squares),
+            ("Square with __slots__", slotted_squares),
+            ("mark per cell", mark_references),
+            ("byte per cell", mark_bytes),
+    ):
+        used = measure(build, size)
+        baseline = baseline or used
+        print(f"  {name:<22} {used / 2 ** 20:9.1f} MiB ({used / baseline:6.1%} of the first)")
+
+
+if __name__ == "__main__":
+    main()
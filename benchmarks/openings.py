@@ -0,0 +1,65 @@
+"""
+move times of the alpha-beta player on repeated openings, without and with the evaluation cache;
+the openings are played again moved and turned, so only the canonical keys can match them
+
+usage: python -m benchmarks.openings [number of openings]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from engine import Engine
+from AI.alpha_beta import AlphaBetaPlayer
+from AI.evaluation_cache import EvaluationCache
+from Structures.canonical import TRANSFORMS
+
+
+def random_opening(rng: random.Random, moves=4) -> list[tuple[int, int]]:
+    cells = {}
+    while len(cells) < moves:
+        cells[rng.randint(-2, 2), rng.randint(-2, 2)] = None
+    return list(cells)
+
+
+def variant(opening, rng: random.Random) -> list[tuple[int, int]]:
+    # the same opening somewhere else on the board, in one of the eight orientations
+    transform = rng.choice(TRANSFORMS)
+    d_row, d_col = rng.randint(-1000, 1000), rng.randint(-1000, 1000)
+    return [(row + d_row, col + d_col) for row, col in (transform(*cell) for cell in opening)]
+
+
+def play(player: AlphaBetaPlayer, openings) -> float:
+    """
+    :return: average seconds per move
+    """
+    start = time.perf_counter()
+    for opening in openings:
+        engine = Engine(marks_needed_to_win=5)
+        for row, col in opening:
+            engine.place(row, col)
+        player.choose_move(engine)
+    return (time.perf_counter() - start) / len(openings)
+
+
+def main(count=20):
+    rng = random.Random(0)
+    openings = [random_opening(rng) for _ in range(count)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.sqlite")
+        print(f"  {'no cache':<28} {play(AlphaBetaPlayer(depth=3, time_limit=10), openings) * 1000:10.1f} ms/move")
+
+        with EvaluationCache(path) as cache:
+            cold = play(AlphaBetaPlayer(depth=3, time_limit=10, cache=cache), openings)
+            print(f"  {'cold cache':<28} {cold * 1000:10.1f} ms/move   {cache.stats}")
+
+        # a new run: the memory is empty, everything comes from the disk
+        with EvaluationCache(path) as cache:
+            warm = play(AlphaBetaPlayer(depth=3, time_limit=10, cache=cache), [variant(o, rng) for o in openings])
+            print(f"  {'warm cache, moved and turned':<28} {warm * 1000:10.1f} ms/move   {cache.stats}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
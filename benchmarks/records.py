@@ -0,0 +1,90 @@
+"""
+writing and decoding of a game archive, in games per second
+
+usage: python -m benchmarks.records [number of games]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from engine import Engine
+from Structures.game_record import ArchiveReader, ArchiveWriter, GameRecord
+from Structures.unlimited_grid import UnlimitedByteGrid
+
+MARKS = "O", "X"
+
+
+def random_game(rng: random.Random, moves=40) -> GameRecord:
+    # a random walk, so the moves stay close to each other as in a real game; stops at a win
+    engine = Engine(rng.choice((4, 5, 6)), marks=MARKS)
+    row = col = 0
+    while len(engine.history) < moves and not engine.is_over:
+        row += rng.randint(-2, 2)
+        col += rng.randint(-2, 2)
+        if engine.mark_at(row, col) is None:
+            engine.place(row, col)
+    return GameRecord.from_engine(engine)
+
+
+def measure(label, games, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {games / elapsed:12,.0f} games/s")
+
+
+def main(games=100_000):
+    rng = random.Random(0)
+    records = [random_game(rng) for _ in range(1000)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.bin")
+
+        def write():
+            with ArchiveWriter(path) as writer:
+                for i in range(games):
+                    writer.write(records[i % len(records)])
+
+        measure("write", games, write)
+        average_moves = sum(len(record.moves) for record in records) / len(records)
+        print(f"  {os.path.getsize(path) / games:.1f} bytes per game of {average_moves:.1f} moves on average")
+
+        with ArchiveReader(path) as reader:
+            def headers():
+                for i in range(len(reader)):
+                    reader.header(i)
+
+            def moves():
+                for i in range(len(reader)):
+                    for _ in reader.moves(i):
+                        pass
+
+            def random_access():
+                for i in rng.sample(range(len(reader)), len(reader)):
+                    for _ in reader.moves(i):
+                        pass
+
+            def into_grid():
+                for i in range(len(reader)):
+                    grid = UnlimitedByteGrid(MARKS)
+                    for move, (row, col) in enumerate(reader.moves(i)):
+                        grid[row, col] = MARKS[move % 2]
+
+            measure("headers", games, headers)
+            measure("moves, in order", games, moves)
+            measure("moves, random order", games, random_access)
+            measure("moves into UnlimitedByteGrid", games, into_grid)
+
+        replayed = min(games, 10_000)
+        with ArchiveReader(path) as reader:
+            def replay():
+                for i in range(replayed):
+                    reader.replay(i)
+
+            measure("replayed on the Engine", replayed, replay)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
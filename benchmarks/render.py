@@ -0,0 +1,146 @@
+"""
+per-frame cost of drawing a board, with one screen update per drawn object (the old behaviour)
+and with dirty rectangles pushed once per frame;
+the dummy video driver copies nothing to a screen, so besides the time the calls of pygame.display.update
+and the pixels they push are counted - that's what a real display pays for
+
+usage: python -m benchmarks.render
+"""
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from board import Board
+from consts import BLACK, WHITE, GREY, Direction
+from engine import Engine
+from UI.renderer import Renderer
+
+
+class _ImmediateRenderer(Renderer):
+    # updates the whole screen for every drawn object, like before the renderer existed
+    def add_dirty(self, rect):
+        super().add_dirty(rect)
+        pygame.display.update()
+
+    def flush(self) -> bool:
+        # everything is on the screen already
+        self.dirty = []
+        return True
+
+
+class _UpdateCounter:
+    def __init__(self, window):
+        """
+        stands in for pygame.display.update while measuring; counts the calls and the pushed pixels
+        """
+        self.screen = window.get_rect()
+        self.update = pygame.display.update
+        self.calls = 0
+        self.pixels = 0
+
+    def __call__(self, rects=None):
+        self.calls += 1
+        if rects is None:
+            self.pixels += self.screen.width * self.screen.height
+        else:
+            rects = [rects] if isinstance(rects, pygame.Rect) else rects
+            self.pixels += sum(rect.clip(self.screen).width * rect.clip(self.screen).height for rect in rects)
+        return self.update(rects) if rects is not None else self.update()
+
+    def __enter__(self):
+        pygame.display.update = self
+        return self
+
+    def __exit__(self, *exc_info):
+        pygame.display.update = self.update
+
+
+def fill_engine(engine: Engine, size):
+    # a run longer than the board is needed to win, so the board can be filled
+    for row in range(size):
+        for col in range(size):
+            engine.place(row, col)
+
+
+def new_board(window, renderer, engine, size) -> Board:
+    board = Board(
+        window=window, renderer=renderer, engine=engine,
+        x=0, y=0, side_size=600,
+        bg_color=WHITE, fg_color=BLACK, strike_through_color=GREY,
+        showed_grid_size=size)
+    board.reset()
+    board.draw_grid()
+    board.draw_squares()
+    renderer.flush()
+    return board
+
+
+def pan(window, renderer, size, frames):
+    # every visible square has a mark, each pan draws a new column of them
+    engine = Engine(marks_needed_to_win=size + 1)
+    fill_engine(engine, size)
+    board = new_board(window, renderer, engine, size)
+
+    directions = [Direction.right, Direction.left]
+    for i in range(frames):
+        board.move(directions[i % 2])
+        yield
+
+
+def place(window, renderer, size, frames):
+    # a mark placed per frame, the way clicks come
+    engine = Engine(marks_needed_to_win=size + 1)
+    board = new_board(window, renderer, engine, size)
+
+    for i in range(frames):
+        row, col = divmod(i % (size * size), size)
+        if engine.mark_at(row, col) is not None:
+            engine.new_round()
+            board.reset()
+            board.draw_grid()
+        square = board.get_square(row, col)
+        square.mark = engine.place(row, col).mark
+        board.draw_mark(square)
+        yield
+
+
+def measure(scenario, renderer_class, size, frames) -> tuple[float, float, float]:
+    """
+    :return: seconds, calls of pygame.display.update and pushed pixels per frame
+    """
+    window = pygame.display.set_mode((600, 600))
+    renderer = renderer_class(window)
+    frames_of_scenario = scenario(window, renderer, size, frames)
+    # the board is set up before counting
+    next(frames_of_scenario)
+    renderer.flush()
+
+    with _UpdateCounter(window) as counter:
+        start = time.perf_counter()
+        for _ in frames_of_scenario:
+            renderer.flush()
+        elapsed = time.perf_counter() - start
+    frames -= 1
+    return elapsed / frames, counter.calls / frames, counter.pixels / frames
+
+
+def main(size=20, frames=100):
+    pygame.display.init()
+    pygame.font.init()
+
+    for scenario in (pan, place):
+        print(f"{size}x{size} {scenario.__name__}, {frames} frames")
+        immediate = measure(scenario, _ImmediateRenderer, size, frames)
+        batched = measure(scenario, Renderer, size, frames)
+        for label, (seconds, calls, pixels) in (("update per draw:", immediate), ("dirty rects:", batched)):
+            print(f"  {label:<16} {seconds * 1000:8.3f} ms/frame {calls:8.1f} updates/frame "
+                  f"{pixels / 1000:10.1f} kpixels/frame")
+        print(f"  {'':<16} {immediate[0] / batched[0]:8.1f}x time {immediate[1] / batched[1]:8.1f}x updates "
+              f"{immediate[2] / batched[2]:10.1f}x pixels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+loopback clients playing on the game server, all on one asyncio loop and one core;
+the latency of a move is the time from sending it to getting it back from the server;
+players wait a random think time before their moves, like people would
+
+usage: python -m benchmarks.server [sessions] [moves per room] [mean think time in ms]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from engine import Engine
+from Network.protocol import JOIN, MOVE, NEW, WELCOME, JOINED, MOVED, WON, ROUND, encode, decode
+from Network.server import GameServer
+
+MARKS_TO_WIN = 5
+
+
+class LoopbackClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.mark = None
+
+    async def expect(self, command) -> list[str]:
+        received, args = decode(await self.reader.readline())
+        if received != command:
+            raise RuntimeError(f"Expected {command}, got {received} {args}")
+        return args
+
+    def send(self, command, *args):
+        self.writer.write(encode(command, *args))
+
+
+async def connect(port) -> LoopbackClient:
+    return LoopbackClient(*await asyncio.open_connection("127.0.0.1", port))
+
+
+async def play_room(port, room, moves, think_time, latencies: list, rng: random.Random):
+    # two players of a room take turns; a local engine tells whose turn it is and when a round is won
+    first, second = await connect(port), await connect(port)
+    first.send(JOIN, room, MARKS_TO_WIN)
+    first.mark = (await first.expect(WELCOME))[0]
+    second.send(JOIN, room, MARKS_TO_WIN)
+    second.mark = (await second.expect(WELCOME))[0]
+    await first.expect(JOINED)
+
+    clients = {client.mark: client for client in (first, second)}
+    engine = Engine(MARKS_TO_WIN)
+    row = col = 0
+    for _ in range(moves):
+        while engine.mark_at(row, col) is not None:
+            row += rng.randint(-1, 1)
+            col += rng.randint(-1, 1)
+
+        await asyncio.sleep(rng.expovariate(1 / think_time) if think_time else 0)
+        mover = clients[engine.current_mark]
+        start = time.perf_counter()
+        mover.send(MOVE, row, col)
+        await mover.expect(MOVED)
+        latencies.append(time.perf_counter() - start)
+
+        result = engine.place(row, col)
+        other = clients[engine.current_mark]
+        await other.expect(MOVED)
+
+        if result.is_win:
+            await first.expect(WON)
+            await second.expect(WON)
+            mover.send(NEW)
+            await first.expect(ROUND)
+            await second.expect(ROUND)
+            engine.new_round()
+
+    for client in (first, second):
+        client.writer.close()
+
+
+async def main(sessions=2000, moves=50, think_ms=500):
+    game_server = GameServer()
+    server = await game_server.start()
+    port = server.sockets[0].getsockname()[1]
+
+    rng = random.Random(0)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        play_room(port, f"room{i}", moves, think_ms / 1000, latencies, random.Random(rng.random()))
+        for i in range(sessions // 2)
+    ))
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+    print(f"{sessions} sessions in {sessions // 2} rooms, {len(latencies)} moves in {elapsed:.1f} s "
+          f"({len(latencies) / elapsed:,.0f} moves/s)")
+    print(f"  round trip: p50 {percentile(50):.2f} ms, p99 {percentile(99):.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    print(f"  server: {game_server.stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,69 @@
+"""
+startup times, each measured in new processes: a bare import of the rules engine
+and the game window showing its first frame, with and without the font paths found in a previous run
+
+usage: python -m benchmarks.startup [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# each prints the seconds from its first line and anything which should be reported
+ENGINE_IMPORT = """
+import time
+start = time.perf_counter()
+import sys
+import engine
+print(time.perf_counter() - start, "pygame loaded" if "pygame" in sys.modules else "")
+"""
+
+FIRST_FRAME = """
+import time
+start = time.perf_counter()
+import pygame
+pygame.display.init()
+pygame.font.init()
+from game import Game
+Game(600, 700, 5, 5).show()
+print(time.perf_counter() - start, "")
+"""
+
+
+def measure(code, runs, env) -> tuple[float, float, str]:
+    """
+    :return: median seconds measured inside the process, median seconds of the whole process and its note
+    """
+    inside, whole = [], []
+    note = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        whole.append(time.perf_counter() - start)
+        seconds, _, note = output.strip().splitlines()[-1].partition(" ")
+        inside.append(float(seconds))
+    return statistics.median(inside), statistics.median(whole), note
+
+
+def main(runs=5):
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "dummy"),
+                   PYGAME_HIDE_SUPPORT_PROMPT="1", PYTHONPATH=ROOT, XDG_CACHE_HOME=cache)
+
+        def report(label, code, runs):
+            inside, whole, note = measure(code, runs, env)
+            print(f"  {label:<32} {inside * 1000:8.1f} ms   {whole * 1000:8.1f} ms with the interpreter  {note}")
+
+        report("import engine", ENGINE_IMPORT, runs)
+        # the first run finds the fonts, the next ones read their paths from the cache
+        report("first frame, fonts not cached", FIRST_FRAME, 1)
+        report("first frame", FIRST_FRAME, runs)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,303 @@
+"""
+benchmarks of the grids, the win detection, the board and the rendering;
+the results are saved as json named after the current commit, so runs of different commits can be compared
+
+usage: python -m benchmarks.suite [--filter TEXT] [--output FILE]
+       python -m benchmarks.suite --compare OLD.json [NEW.json]
+           NEW.json is a new run when not given
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from engine import Engine
+from Structures.unlimited_grid import UnlimitedGrid, UnlimitedGrid_queue
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# a slower result than this times the old one is reported as a regression
+REGRESSION_RATIO = 1.1
+
+# name --> a function preparing the benchmark and returning the callable to time
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+class _Cell:
+    # an object per explored cell, as the board used to keep
+    __slots__ = ("row", "col")
+
+    def __init__(self, row, col):
+        self.row = row
+        self.col = col
+
+
+GRIDS = {
+    "queue": lambda: UnlimitedGrid_queue(_Cell),
+    "chunked": lambda: UnlimitedGrid(_Cell),
+}
+STEPS = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+
+# <editor-fold desc="Grid">
+def _register_grid_benchmarks(grid_name, new_grid):
+    for direction, (d_row, d_col) in STEPS.items():
+        @benchmark(f"grid.{grid_name}.extend_{direction}")
+        def extend(d_row=d_row, d_col=d_col):
+            # walks 200 cells away from (0, 0), with a 10 cell wide band of shown cells
+            def run():
+                grid = new_grid()
+                for i in range(200):
+                    for j in range(10):
+                        grid[i * d_row + j * abs(d_col), i * d_col + j * abs(d_row)]
+            return run
+
+    @benchmark(f"grid.{grid_name}.far_jump")
+    def far_jump():
+        def run():
+            grid = new_grid()
+            grid[0, 0]
+            grid[150, -150]
+        return run
+
+    @benchmark(f"grid.{grid_name}.get_row_range")
+    def get_row_range():
+        grid = new_grid()
+        for row in range(-50, 50):
+            grid.get_row_range(row, -50, 50)
+
+        def run():
+            for row in range(-50, 50):
+                grid.get_row_range(row, -50, 50)
+        return run
+
+
+for _name, _new_grid in GRIDS.items():
+    _register_grid_benchmarks(_name, _new_grid)
+
+
+# </editor-fold>
+
+
+# <editor-fold desc="Win Detection">
+def _random_moves(rng: random.Random, count) -> list[tuple[int, int]]:
+    # a random walk around the origin without repeated cells
+    row = col = 0
+    moves = {}
+    while len(moves) < count:
+        row += rng.randint(-1, 1)
+        col += rng.randint(-1, 1)
+        moves[row, col] = None
+    return list(moves)
+
+
+def _register_win_benchmarks(marks_needed_to_win):
+    @benchmark(f"win.place.k{marks_needed_to_win}")
+    def place():
+        # every move is checked for a win; the round starts over after one
+        moves = _random_moves(random.Random(marks_needed_to_win), 500)
+
+        def run():
+            engine = Engine(marks_needed_to_win)
+            for row, col in moves:
+                if engine.mark_at(row, col) is not None:
+                    continue
+                if engine.place(row, col).is_win:
+                    engine.new_round()
+        return run
+
+    @benchmark(f"win.place_undo.k{marks_needed_to_win}")
+    def place_undo():
+        # a move tried and taken back on a crowded board, as searching players do
+        engine = Engine(marks_needed_to_win=1000)
+        for row, col in _random_moves(random.Random(0), 500):
+            engine.place(row, col)
+        engine.marks_needed_to_win = marks_needed_to_win
+        free = [(row, col) for row in range(-10, 10) for col in range(-10, 10) if engine.mark_at(row, col) is None]
+
+        def run():
+            for row, col in free:
+                engine.place(row, col)
+                engine.undo()
+        return run
+
+
+for _k in (3, 5, 8):
+    _register_win_benchmarks(_k)
+
+
+# </editor-fold>
+
+
+# <editor-fold desc="Board And Rendering">
+def _new_board(size=20, filled=20):
+    import pygame
+    from board import Board
+    from consts import BLACK, WHITE, GREY
+    from UI.renderer import Renderer
+
+    pygame.display.init()
+    pygame.font.init()
+    window = pygame.display.set_mode((600, 700))
+    renderer = Renderer(window)
+    # a run longer than the filled area is needed to win, so it can be filled
+    engine = Engine(marks_needed_to_win=filled + 1)
+    for row in range(filled):
+        for col in range(filled):
+            engine.place(row, col)
+    board = Board(
+        window=window, renderer=renderer, engine=engine,
+        x=0, y=100, side_size=600,
+        bg_color=WHITE, fg_color=BLACK, strike_through_color=GREY,
+        showed_grid_size=size)
+    return window, renderer, board
+
+
+@benchmark("board.update_showed_grid")
+def update_showed_grid():
+    _, _, board = _new_board()
+    return board.reset
+
+
+def _register_board_benchmarks(suffix, size, filled):
+    @benchmark(f"board.move{suffix}")
+    def move():
+        from consts import Direction
+
+        _, renderer, board = _new_board(size, filled)
+        directions = [Direction.right, Direction.down, Direction.left, Direction.up]
+
+        def run():
+            for direction in directions:
+                board.move(direction)
+            renderer.flush()
+        return run
+
+    @benchmark(f"render.full_frame{suffix}")
+    def full_frame():
+        from consts import WHITE
+
+        window, renderer, board = _new_board(size, filled)
+
+        def run():
+            window.fill(WHITE)
+            renderer.add_dirty(window.get_rect())
+            board.draw_grid()
+            board.draw_squares()
+            renderer.flush()
+        return run
+
+    @benchmark(f"board.zoom{suffix}")
+    def zoom():
+        _, renderer, board = _new_board(size, filled)
+
+        def run():
+            board.zoom(1)
+            board.zoom(-1)
+            renderer.flush()
+        return run
+
+
+_register_board_benchmarks("", 20, 20)
+# the most zoomed out level, drawn without glyphs and grid lines
+_register_board_benchmarks(".zoomed_out", 200, 100)
+
+
+# </editor-fold>
+
+
+def measure(setup, repeat=5) -> dict:
+    try:
+        run = setup()
+    except ImportError as error:
+        return {"skipped": str(error)}
+
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    times = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+    return {"min": min(times), "median": statistics.median(times), "number": number, "repeat": repeat}
+
+
+def current_commit() -> tuple[str, bool]:
+    """
+    :return: the hash of HEAD and whether the tree has uncommitted changes
+    """
+    def git(*args):
+        return subprocess.run(["git", *args], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip()
+
+    return git("rev-parse", "--short", "HEAD") or "unknown", bool(git("status", "--porcelain", "--untracked-files=no"))
+
+
+def run_suite(name_filter="") -> dict:
+    commit, dirty = current_commit()
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if name_filter not in name:
+            continue
+        results[name] = measure(setup)
+        result = results[name]
+        print(f"  {name:<34} " + (f"skipped: {result['skipped']}" if "skipped" in result
+                                  else f"{result['min'] * 1e6:12.1f} us"))
+
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict):
+    print(f"{old['commit']} --> {new['commit']}")
+    for name, result in new["results"].items():
+        before = old["results"].get(name, {})
+        if "min" not in result or "min" not in before:
+            continue
+        ratio = result["min"] / before["min"]
+        note = "regression" if ratio > REGRESSION_RATIO else "faster" if ratio < 1 / REGRESSION_RATIO else ""
+        print(f"  {name:<34} {before['min'] * 1e6:12.1f} us {result['min'] * 1e6:12.1f} us {ratio:6.2f}x  {note}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filter", default="", help="run only the benchmarks whose name contains it")
+    parser.add_argument("--output", help=f"where the results are saved; {RESULTS_DIR}/<commit>.json by default")
+    parser.add_argument("--compare", nargs="+", metavar="FILE")
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            compare(json.load(old), json.load(new))
+        return
+
+    run = run_suite(args.filter)
+    output = args.output or os.path.join(RESULTS_DIR, f"{run['commit']}{'-dirty' if run['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(run, file, indent=2)
+    print(f"saved to {output}")
+
+    if args.compare:
+        with open(args.compare[0]) as old:
+            compare(json.load(old), run)
+
+
+if __name__ == "__main__":
+    main()
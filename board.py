@@ -1,7 +1,11 @@
+from __future__ import annotations
+
+from collections import deque
+
 import pygame
 
+from instrumentation import metrics
 from UI.base_object import BaseObject
-from Structures.unlimited_grid import UnlimitedGrid
 from square import Square
 from consts import WinningOptions, Direction
 
@@ -15,196 +19,400 @@ class Board(BaseObject):
         def __repr__(self):
             return f"{self.row} {self.col}"
 
+    # zoom levels, in cells per side
+    min_grid_size = 3
+    max_grid_size = 200
+    # above it the marks are drawn as blocks of color and the grid lines are dropped
+    detail_limit = 40
+    # change of the number of shown cells per zoom step
+    zoom_factor = 1.25
+
     def __init__(self,
-                 window,
+                 window, renderer, engine,
                  x, y, side_size,
                  bg_color, fg_color, strike_through_color,
-                 showed_grid_size=3):
+                 showed_grid_size=3, mark_colors=None):
+        """
+        :param mark_colors: {mark: color} of the blocks drawn instead of the marks when zoomed out;
+                            fg_color for the missing ones
+        """
+        super().__init__(window, x, y, side_size, side_size)
+
+        self.renderer = renderer
+        self.engine = engine
+        self.side_size = side_size
+
+        self.fg_color = fg_color
+        self.bg_color = bg_color
+        self.strike_through_color = strike_through_color
+        self.mark_colors = mark_colors or {}
+
+        self.tracker = Board.Tracker()
+        self.showed_grid: deque[deque[Square]] = deque()
+        self.__set_layout(showed_grid_size)
+        self.__update_showed_grid()
 
-        # <editor-fold desc="Helper Init Functions">
+    def __set_layout(self, showed_grid_size):
+        # <editor-fold desc="Helper Layout Functions">
         def get_line_thickness() -> int:
+            if not self.is_detailed:
+                return 0
             if self.showed_grid_size <= 4:
                 return 8
             if self.showed_grid_size <= 10:
                 return 4
             return 2
 
-        def get_square_size() -> float:
-            return (self.width - self.line_thickness * (self.showed_grid_size - 1)) / self.showed_grid_size
+        def get_square_size() -> int:
+            # whole pixels, so the board can be scrolled by exactly one square
+            return (self.side_size - self.line_thickness * (self.showed_grid_size - 1)) // self.showed_grid_size
 
-        def get_unit() -> float:
+        def get_unit() -> int:
             return self.square_size + self.line_thickness
 
         # </editor-fold>
 
-        super().__init__(window, x, y, side_size, side_size)
-
         self.showed_grid_size = showed_grid_size
+        self.is_detailed = showed_grid_size <= self.detail_limit
 
         self.line_thickness = get_line_thickness()
         self.square_size = get_square_size()
         self.unit_size = get_unit()
 
-        self.fg_color = fg_color
-        self.bg_color = bg_color
-        self.strike_through_color = strike_through_color
+        # drop the pixels left over by the rounding
+        self.width = self.height = self.unit_size * self.showed_grid_size - self.line_thickness
+        self.size = self.width, self.height
 
-        Square.set_globals(
-            self.fg_color,
-            None,
-            pygame.font.SysFont("Comic Sans MS", int(self.square_size * 0.9)),
-            self.square_size,
-            self.window,
-        )
+        # one font per zoom level, kept by the cache
+        self.font = self.renderer.cache.font("Comic Sans MS", int(self.square_size * 0.9)) if self.is_detailed else None
 
-        self.tracker = Board.Tracker()
-        self.grid = UnlimitedGrid(Square.new_square, self.__get_base_grid())
-        self.showed_grid = []
-        self.__update_showed_grid()
+    @property
+    def grid(self):
+        return self.engine.grid
 
     @property
     def squares(self):
+        """
+        the shown squares; only the ones with a mark when zoomed out
+        """
+        if not self.is_detailed:
+            n = self.showed_grid_size
+            return self.__marked_squares(self.tracker.row, self.tracker.col, n, n)
         return [sq for row in self.showed_grid for sq in row]
 
     # <editor-fold desc="Private Methods">
-    def __get_base_grid(self):
+    def __new_squares(self, row, col, height, width) -> list[list[Square]]:
+        # the marks of the whole area are read from the grid at once
         return [
-            [Square(row=i, col=j, **self.__get_square_pos(i, j)) for j in range(self.showed_grid_size)]
-            for i in range(self.showed_grid_size)
+            [Square(self, row=row + i, col=col + j, mark=mark) for j, mark in enumerate(marks)]
+            for i, marks in enumerate(self.grid.get_window(row, col, height, width))
         ]
 
-    def __get_square_pos(self, row, col) -> dict[str, float]:
-        x = self.x + col * self.unit_size
-        y = self.y + row * self.unit_size
-        return {"x": x, "y": y}
+    def __marks_in(self, row, col, height, width):
+        # yields (row, col, mark) of the marks in an area;
+        # from the occupancy index when the area has more cells than the board has marks
+        if len(self.engine.occupied) < height * width:
+            for (i, j), mark in self.engine.occupied.items():
+                if row <= i < row + height and col <= j < col + width:
+                    yield i, j, mark
+            return
+
+        for i, marks in enumerate(self.grid.get_window(row, col, height, width)):
+            for j, mark in enumerate(marks):
+                if mark is not None:
+                    yield row + i, col + j, mark
+
+    def __marked_squares(self, row, col, height, width) -> list[Square]:
+        return [Square(self, row=i, col=j, mark=mark) for i, j, mark in self.__marks_in(row, col, height, width)]
+
+    def __draw_blocks(self):
+        # zoomed out: a pixel per cell, scaled up to the squares at once; there are no grid lines to keep
+        n = self.showed_grid_size
+        cells = pygame.Surface((n, n))
+        cells.fill(self.bg_color)
+        colors = {mark: cells.map_rgb(color) for mark, color in self.mark_colors.items()}
+        default_color = cells.map_rgb(self.fg_color)
+
+        pixels = pygame.PixelArray(cells)
+        top, left = self.tracker.row, self.tracker.col
+        for row, col, mark in self.__marks_in(top, left, n, n):
+            pixels[col - left, row - top] = colors.get(mark, default_color)
+        pixels.close()
+
+        self.window.blit(pygame.transform.scale(cells, self.size), self.pos)
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
 
     def __update_showed_grid(self):
-        # get new squares
-        self.showed_grid = [
-            [self.grid[i+self.tracker.row, j+self.tracker.col] for j in range(self.showed_grid_size)]
-            for i in range(self.showed_grid_size)
-        ]
+        # views of the currently shown cells; zoomed out they're made only when needed
+        with metrics.timed("board.update_showed_grid"):
+            n = self.showed_grid_size
+            if not self.is_detailed:
+                self.showed_grid = deque()
+                return
+            self.showed_grid = deque(deque(row) for row in self.__new_squares(self.tracker.row, self.tracker.col, n, n))
+
+    def __shift_showed_grid(self, d_row, d_col) -> list[Square]:
+        """
+        moves the shown cells by one row or column after the tracker has moved
+        :return: the newly shown squares; only the ones with a mark when zoomed out
+        """
+        n = self.showed_grid_size
+        if not self.is_detailed:
+            if d_row:
+                return self.__marked_squares(self.tracker.row + (n - 1 if d_row > 0 else 0), self.tracker.col, 1, n)
+            return self.__marked_squares(self.tracker.row, self.tracker.col + (n - 1 if d_col > 0 else 0), n, 1)
+
+        if d_row:
+            row = self.tracker.row + (n - 1 if d_row > 0 else 0)
+            new_row = deque(self.__new_squares(row, self.tracker.col, 1, n)[0])
+            if d_row > 0:
+                self.showed_grid.popleft()
+                self.showed_grid.append(new_row)
+            else:
+                self.showed_grid.pop()
+                self.showed_grid.appendleft(new_row)
+            return list(new_row)
+
+        col = self.tracker.col + (n - 1 if d_col > 0 else 0)
+        new_squares = [line[0] for line in self.__new_squares(self.tracker.row, col, n, 1)]
+        for row, square in zip(self.showed_grid, new_squares):
+            if d_col > 0:
+                row.popleft()
+                row.append(square)
+            else:
+                row.pop()
+                row.appendleft(square)
+        return new_squares
+
+    def __scroll(self, d_row, d_col):
+        # shifts the board's pixels against the move and redraws the uncovered strip of the grid
+        self.window.set_clip(self.x, self.y, self.width, self.height)
+        self.window.scroll(-d_col * self.unit_size, -d_row * self.unit_size)
+        self.window.set_clip(None)
+
+        if d_col > 0:
+            strip = pygame.Rect(self.width - self.unit_size, 0, self.unit_size, self.height)
+        elif d_col < 0:
+            strip = pygame.Rect(0, 0, self.unit_size, self.height)
+        elif d_row > 0:
+            strip = pygame.Rect(0, self.height - self.unit_size, self.width, self.unit_size)
+        else:
+            strip = pygame.Rect(0, 0, self.width, self.unit_size)
 
-        # update squares' (x, y)
-        for i, row in enumerate(self.showed_grid):
-            for j, sq in enumerate(row):
-                sq.set_pos(**self.__get_square_pos(i, j))
+        self.window.blit(self.__get_grid_layer(), strip.move(self.pos), strip)
+
+    def __draw_grid_lines(self, surface):
+        surface.fill(self.bg_color)
+        if not self.line_thickness:
+            return
+
+        # whole-pixel rects filling exactly the gutters cell_at leaves out, so a scrolled board
+        # has the same pixels as a redrawn one
+        for i in range(self.showed_grid_size - 1):
+            offset = self.square_size + i * self.unit_size
+            # vertical line
+            surface.fill(self.fg_color, (offset, 0, self.line_thickness, self.height))
+            # horizontal line
+            surface.fill(self.fg_color, (0, offset, self.width, self.line_thickness))
+
+    def __get_grid_layer(self):
+        # the grid is drawn once per layout and then only blitted
+        return self.renderer.cache.layer(
+            ("grid", self.size, self.showed_grid_size, self.line_thickness, self.fg_color, self.bg_color),
+            self.size,
+            self.__draw_grid_lines,
+        )
 
     # </editor-fold>
 
+    def get_square_pos(self, row, col) -> tuple[float, float]:
+        """
+        :param row, col: position in the grid
+        :return: (x, y) of the square on the screen
+        """
+        x = self.x + (col - self.tracker.col) * self.unit_size
+        y = self.y + (row - self.tracker.row) * self.unit_size
+        return x, y
+
+    def is_visible(self, row, col) -> bool:
+        return (0 <= row - self.tracker.row < self.showed_grid_size and
+                0 <= col - self.tracker.col < self.showed_grid_size)
+
+    def get_square(self, row, col) -> Square | None:
+        """
+        :return: the shown square of the cell or None if it's not visible
+        """
+        if not self.is_visible(row, col):
+            return None
+        if not self.is_detailed:
+            return Square(self, row=row, col=col, mark=self.grid[row, col])
+        return self.showed_grid[row - self.tracker.row][col - self.tracker.col]
+
+    def cell_at(self, x, y) -> tuple[int, int] | None:
+        """
+        maps a point on the screen to the grid
+        :return: (row, col) of the cell under the point or None if it's outside the board or on a grid line
+        """
+        # half-open, unlike check_collision: the pixel right after the board belongs to no cell
+        if not (0 <= x - self.x < self.width and 0 <= y - self.y < self.height):
+            return None
+
+        i, y_offset = divmod(int(y - self.y), self.unit_size)
+        j, x_offset = divmod(int(x - self.x), self.unit_size)
+        # gutter between the squares
+        if x_offset >= self.square_size or y_offset >= self.square_size:
+            return None
+
+        return self.tracker.row + i, self.tracker.col + j
+
+    def draw_mark(self, square: Square):
+        if not self.is_detailed:
+            color = self.mark_colors.get(square.mark, self.fg_color)
+            self.window.fill(color, (square.x, square.y, self.square_size, self.square_size))
+            self.renderer.add_dirty((square.x, square.y, self.square_size, self.square_size))
+            return
+
+        text = self.renderer.cache.text(self.font, square.mark, self.fg_color)
+        width, height = text.get_size()
+        x = square.x + (self.square_size - width) / 2
+        y = square.y + (self.square_size - height) / 2
+        self.window.blit(text, (x, y))
+        self.renderer.add_dirty((square.x, square.y, self.square_size, self.square_size))
+
+    def erase_mark(self, square: Square):
+        self.window.fill(self.bg_color, (square.x, square.y, self.square_size, self.square_size))
+        self.renderer.add_dirty((square.x, square.y, self.square_size, self.square_size))
+
     def draw_squares(self):
+        if not self.is_detailed:
+            self.__draw_blocks()
+            return
+
         for sq in self.squares:
             if sq.is_clicked:
-                sq.draw_mark()
+                self.draw_mark(sq)
+
+    def jump_to(self, row, col):
+        """
+        shows the cell in the middle of the board; the shown squares are read in one go
+        """
+        self.tracker.row = row - self.showed_grid_size // 2
+        self.tracker.col = col - self.showed_grid_size // 2
+        self.__update_showed_grid()
+        self.draw_grid()
+        self.draw_squares()
+
+    def zoom(self, steps):
+        """
+        changes the number of shown cells keeping the middle one in place
+        :param steps: positive zooms in (fewer, bigger cells), negative zooms out
+        """
+        n = self.showed_grid_size
+        new_n = round(n / self.zoom_factor ** steps)
+        # every step changes the size
+        if new_n == n:
+            new_n = n - 1 if steps > 0 else n + 1
+        new_n = min(max(new_n, self.min_grid_size), self.max_grid_size)
+        if new_n == n:
+            return
+
+        middle_row, middle_col = self.tracker.row + n // 2, self.tracker.col + n // 2
+        self.window.fill(self.bg_color, (self.x, self.y, self.side_size, self.side_size))
+        self.renderer.add_dirty((self.x, self.y, self.side_size, self.side_size))
+        self.__set_layout(new_n)
+        self.jump_to(middle_row, middle_col)
 
     def move(self, direction):
         if direction == Direction.up:
-            self.tracker.row -= 1
+            d_row, d_col = -1, 0
         elif direction == Direction.down:
-            self.tracker.row += 1
+            d_row, d_col = 1, 0
         elif direction == Direction.left:
-            self.tracker.col -= 1
+            d_row, d_col = 0, -1
         elif direction == Direction.right:
-            self.tracker.col += 1
+            d_row, d_col = 0, 1
         else:
             raise ValueError("Invalid direction", direction)
 
-        self.__update_showed_grid()
-        self.draw_grid()
-        self.draw_squares()
-
-    def draw_grid(self):
-        self.window.fill(self.bg_color, (self.x, self.y, self.width, self.height))
+        self.tracker.row += d_row
+        self.tracker.col += d_col
 
-        # vertical lines
-        x = self.x + self.square_size + self.line_thickness / 2
-        y = self.y
-        for i in range(self.showed_grid_size - 1):
-            pygame.draw.line(
-                self.window,
-                self.fg_color,
-                (x, y),
-                (x, y + self.height),
-                self.line_thickness
-            )
-            x += self.square_size + self.line_thickness
+        # only the uncovered row or column is fetched and drawn
+        with metrics.timed("board.shift_showed_grid"):
+            new_squares = self.__shift_showed_grid(d_row, d_col)
+        self.__scroll(d_row, d_col)
+        for square in new_squares:
+            if square.is_clicked:
+                self.draw_mark(square)
 
-        # horizontal lines
-        x = self.x
-        y = self.y + self.square_size + self.line_thickness / 2
-        for i in range(self.showed_grid_size - 1):
-            pygame.draw.line(
-                self.window,
-                self.fg_color,
-                (x, y),
-                (x + self.width, y),
-                self.line_thickness
-            )
-            y += self.square_size + self.line_thickness
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
 
-        pygame.display.update()
+    def draw_grid(self):
+        self.window.blit(self.__get_grid_layer(), self.pos)
+        self.renderer.add_dirty((self.x, self.y, self.width, self.height))
 
     def clear_grid(self):
         self.draw_grid()
 
     def draw_strike_through(self, sequence: list[Square], winning_option):
+        rect = None
         # horizontal
         if winning_option == WinningOptions.horizontal:
             sequence.sort(key=lambda x: x.col)
             first, last = sequence[0], sequence[-1]
-            start_x, start_y = first.x, first.y + first.side_size / 2
-            end_x, end_y = last.x + last.side_size, start_y
-            pygame.draw.line(
+            start_x, start_y = first.x, first.y + self.square_size / 2
+            end_x, end_y = last.x + self.square_size, start_y
+            rect = pygame.draw.line(
                 self.window,
                 self.strike_through_color,
                 (start_x, start_y),
                 (end_x, end_y),
-                self.line_thickness)
+                max(self.line_thickness, 1))
 
         # vertical
         elif winning_option == WinningOptions.vertical:
             sequence.sort(key=lambda x: x.row)
             first, last = sequence[0], sequence[-1]
-            start_x, start_y = first.x + first.side_size / 2, first.y
-            end_x, end_y = start_x, last.y + last.side_size
-            pygame.draw.line(
+            start_x, start_y = first.x + self.square_size / 2, first.y
+            end_x, end_y = start_x, last.y + self.square_size
+            rect = pygame.draw.line(
                 self.window,
                 self.strike_through_color,
                 (start_x, start_y),
                 (end_x, end_y),
-                self.line_thickness)
+                max(self.line_thickness, 1))
 
         # diagonal \
         elif winning_option == WinningOptions.neg_diagonal:
             sequence.sort(key=lambda x: x.col)
             first, last = sequence[0], sequence[-1]
             start_x, start_y = first.x, first.y
-            end_x, end_y = last.x + last.side_size, last.y + last.side_size
-            pygame.draw.line(
+            end_x, end_y = last.x + self.square_size, last.y + self.square_size
+            rect = pygame.draw.line(
                 self.window,
                 self.strike_through_color,
                 (start_x, start_y),
                 (end_x, end_y),
-                int(self.line_thickness * 1.5)
+                max(int(self.line_thickness * 1.5), 1)
             )
 
         # diagonal /
         elif winning_option == WinningOptions.pos_diagonal:
             sequence.sort(key=lambda x: x.col)
             first, last = sequence[0], sequence[-1]
-            start_x, start_y = first.x, first.y + first.side_size
-            end_x, end_y = last.x + last.side_size, last.y
-            pygame.draw.line(
+            start_x, start_y = first.x, first.y + self.square_size
+            end_x, end_y = last.x + self.square_size, last.y
+            rect = pygame.draw.line(
                 self.window,
                 self.strike_through_color,
                 (start_x, start_y),
                 (end_x, end_y),
-                int(self.line_thickness * 1.5)
+                max(int(self.line_thickness * 1.5), 1)
             )
 
-        pygame.display.update()
+        if rect is not None:
+            self.renderer.add_dirty(rect)
 
     def reset(self):
         self.tracker = Board.Tracker()
-        self.grid = UnlimitedGrid(Square.new_square, self.__get_base_grid())
         self.__update_showed_grid()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import time
+from typing import NamedTuple
+
+from instrumentation import metrics
+from Structures.line_index import LineIndex, Run
+from Structures.occupancy import OccupancyIndex
+from Structures.player import Player
+from Structures.threats import ThreatIndex
+from Structures.unlimited_grid import UnlimitedByteGrid
+from Structures.zobrist import Zobrist
+
+
+class MoveResult(NamedTuple):
+    row: int
+    col: int
+    mark: str
+    winning_run: Run | None = None
+
+    @property
+    def is_win(self) -> bool:
+        return self.winning_run is not None
+
+
+class MoveNode:
+    __slots__ = ("parent", "row", "col", "depth")
+
+    def __init__(self, parent: MoveNode | None, row, col):
+        """
+        a move in a persistent tree of the round's moves; positions sharing a beginning share its nodes,
+        so a position is kept by holding its last node
+        """
+        self.parent = parent
+        self.row = row
+        self.col = col
+        self.depth = parent.depth + 1 if parent is not None else 1
+
+    def path_from(self, ancestor: MoveNode | None) -> list[tuple[int, int]]:
+        """
+        :return: the moves after the ancestor, up to and including this one
+        """
+        moves = []
+        node = self
+        while node is not ancestor:
+            moves.append((node.row, node.col))
+            node = node.parent
+        return moves[::-1]
+
+    @staticmethod
+    def common_ancestor(first: MoveNode | None, second: MoveNode | None) -> MoveNode | None:
+        def depth(node):
+            return node.depth if node is not None else 0
+
+        while depth(first) > depth(second):
+            first = first.parent
+        while depth(second) > depth(first):
+            second = second.parent
+        while first is not second:
+            first, second = first.parent, second.parent
+        return first
+
+
+class Snapshot(NamedTuple):
+    # last move of the position; None before the first one
+    position: MoveNode | None
+    marks: tuple[str, str]
+    scores: tuple[int, ...]
+    marks_needed_to_win: int
+
+
+class Engine:
+    def __init__(self, marks_needed_to_win=3, marks=("O", "X"), compact=False):
+        """
+        rules of the unlimited tic-tac-toe without any rendering;
+        every instance is an independent game
+        :param marks_needed_to_win: length of a run which wins the round
+        :param marks: marks of the players; marks[0] moves first in the first round
+        :param compact: keep a single byte per cell instead of a reference to the mark
+        """
+        # open and half-open runs close to a win; kept only after track_threats
+        self.threats: ThreatIndex | None = None
+        self.marks_needed_to_win = marks_needed_to_win
+        self.marks = tuple(marks)
+        self.players = tuple(Player(mark, score=0) for mark in self.marks)
+
+        self.compact = compact
+        values = self.marks
+        self.lines = LineIndex(lambda: UnlimitedByteGrid(values)) if compact else LineIndex()
+        self.move_counter = 0
+        self.winner = None
+        # moves of the current round
+        self.history: list[tuple[int, int]] = []
+        # placed marks with their bounding box, for finding them on the unlimited board
+        self.occupied = OccupancyIndex()
+        # last move of the round in the persistent move tree
+        self.position: MoveNode | None = None
+
+        # zobrist hash of the marks on the board, updated with every move
+        self.zobrist = Zobrist()
+        self.hash = 0
+
+    @property
+    def marks_needed_to_win(self) -> int:
+        return self.__marks_needed_to_win
+
+    @marks_needed_to_win.setter
+    def marks_needed_to_win(self, value):
+        self.__marks_needed_to_win = value
+        # what counts as a threat depends on it
+        if self.threats is not None and self.threats.marks_needed_to_win != value:
+            self.threats.marks_needed_to_win = value
+            self.threats.rebuild()
+
+    @property
+    def grid(self):
+        """
+        marks of the current round; empty cells are None
+        """
+        return self.lines.grid
+
+    @property
+    def current_mark(self) -> str:
+        return self.marks[self.move_counter % 2]
+
+    @property
+    def is_over(self) -> bool:
+        return self.winner is not None
+
+    def mark_at(self, row, col):
+        return self.lines.mark_at(row, col)
+
+    def place(self, row, col) -> MoveResult:
+        """
+        puts the current player's mark on (row, col)
+        """
+        if self.is_over:
+            raise ValueError("The round is over", self.winner)
+
+        mark = self.current_mark
+        # the runs through the new mark are the win check
+        start = time.perf_counter() if metrics.enabled else None
+        runs = self.lines.place(row, col, mark)
+        self.move_counter += 1
+        self.history.append((row, col))
+        self.position = MoveNode(self.position, row, col)
+        self.occupied.add(row, col, mark)
+        self.hash ^= self.zobrist.key(row, col, mark)
+        if self.threats is not None:
+            self.threats.update(row, col)
+
+        winning_run = None
+        for run in runs:
+            if run.length >= self.marks_needed_to_win:
+                winning_run = run
+                self.winner = mark
+                self.__add_player_score(mark, 1)
+                break
+
+        if start is not None:
+            metrics.add_time("engine.win_check", time.perf_counter() - start)
+        return MoveResult(row, col, mark, winning_run)
+
+    def undo(self) -> tuple[int, int]:
+        """
+        takes back the last move of the round, together with the win it made
+        :return: (row, col) of the removed mark
+        """
+        if not self.history:
+            raise ValueError("No moves to undo")
+
+        row, col = self.history.pop()
+        mark = self.mark_at(row, col)
+        if self.winner is not None:
+            self.__add_player_score(self.winner, -1)
+            self.winner = None
+
+        self.lines.remove(row, col)
+        self.occupied.remove(row, col)
+        if self.threats is not None:
+            self.threats.update(row, col)
+        self.position = self.position.parent
+        self.move_counter -= 1
+        self.hash ^= self.zobrist.key(row, col, mark)
+        return row, col
+
+    def new_round(self):
+        """
+        clears the board; the other player moves first
+        """
+        self.move_counter = 0
+        self.winner = None
+        self.history = []
+        self.position = None
+        self.occupied.clear()
+        self.hash = 0
+        self.lines.clear()
+        if self.threats is not None:
+            self.threats.clear()
+        self.marks = self.marks[::-1]
+
+    def track_threats(self) -> ThreatIndex:
+        """
+        starts keeping the threats of both players up to date with every move;
+        each move then also looks at the lines through it, up to marks_needed_to_win cells away
+        """
+        if self.threats is None:
+            self.threats = ThreatIndex(self.lines, self.occupied, self.marks_needed_to_win)
+            self.threats.rebuild()
+        return self.threats
+
+    def snapshot(self) -> Snapshot:
+        """
+        the current position in constant time; the moves are shared with the engine, not copied
+        """
+        return Snapshot(self.position, self.marks, tuple(player.score for player in self.players),
+                        self.marks_needed_to_win)
+
+    def copy(self) -> Engine:
+        """
+        an independent engine in the same position with the same scores, eg. for a search on another thread
+        """
+        engine = Engine(self.marks_needed_to_win, marks=[player.mark for player in self.players], compact=self.compact)
+        engine.restore(self.snapshot())
+        return engine
+
+    def restore(self, snapshot: Snapshot):
+        """
+        goes to the position of the snapshot by taking back the moves down to the common beginning
+        and playing the rest; the cost is the number of moves which differ
+        """
+        target = snapshot.position
+        # positions of different rounds have nothing in common
+        common = MoveNode.common_ancestor(self.position, target) if self.marks == snapshot.marks else None
+        while self.position is not common:
+            self.undo()
+
+        self.marks = snapshot.marks
+        self.marks_needed_to_win = snapshot.marks_needed_to_win
+        if target is not None:
+            for row, col in target.path_from(common):
+                self.place(row, col)
+
+        for player, score in zip(self.players, snapshot.scores):
+            player.score = score
+
+    def next_move_toward(self, snapshot: Snapshot) -> tuple[int, int] | None:
+        """
+        :return: the move following the current position on the way to a later position of the snapshot;
+                 None if the snapshot doesn't continue the current position
+        """
+        node = snapshot.position
+        current_depth = self.position.depth if self.position is not None else 0
+        if node is None or node.depth <= current_depth or self.marks != snapshot.marks:
+            return None
+
+        while node.depth > current_depth + 1:
+            node = node.parent
+
+        # the same moves may have been played again as new nodes
+        ancestor, position = node.parent, self.position
+        while ancestor is not position:
+            if (ancestor.row, ancestor.col) != (position.row, position.col):
+                return None
+            ancestor, position = ancestor.parent, position.parent
+        return node.row, node.col
+
+    def __add_player_score(self, mark, points):
+        for player in self.players:
+            if player.mark == mark:
+                player.score += points
+                return
@@ -1,19 +1,41 @@
 from __future__ import annotations
 
+import logging
+import time
+
 import pygame
 
-from square import Square
-from Structures.player import Player
+from engine import Engine, MoveResult
 from UI.score_bar import ScoreBar
-from consts import BLACK, WHITE, GREY, WinningOptions, Direction
+from UI.renderer import Renderer
+from UI.event_loop import EventLoop
+from UI.stats_overlay import StatsOverlay
+from UI.metrics_overlay import MetricsOverlay
+from UI.minimap import Minimap
+from UI.threat_overlay import ThreatOverlay
+from instrumentation import metrics
+from Network.protocol import WELCOME, MOVED, ROUND, ERR, CLOSED
+from Structures.journal import Journal
+from consts import BLACK, WHITE, GREY, RED, Direction
 from board import Board
 
+log = logging.getLogger(__name__)
+
+# carries the messages of the server from the client's thread to the event loop
+NETWORK_MESSAGE = pygame.event.custom_type()
+# carries the move of the computer player from its search thread to the event loop
+AI_MOVE = pygame.event.custom_type()
+
 
 class Game:
     def __init__(self,
                  width=500, height=700,
                  showed_grid_size=3, marks_needed_to_win=3,
-                 bg_color=WHITE, fg_color=BLACK):
+                 bg_color=WHITE, fg_color=BLACK,
+                 opponent=None, depth=4, time_limit=1.0, cache_path=None,
+                 server=None, room="lobby",
+                 fps=60, instrument=False,
+                 journal_path=None, resume=True):
         # rect
         self.x, self.y = (0, 0)
         self.size = width, height
@@ -30,14 +52,70 @@ class Game:
         pygame.display.set_caption("Tic Tac Toe")
         self.window = pygame.display.set_mode((width, height))
         self.window.fill(bg_color)
+        self.renderer = Renderer(self.window)
+        self.loop = EventLoop(fps=fps)
 
         # game attributes
-        self.move_counter = 0
-        self.marks_needed_to_win = marks_needed_to_win
-        self.players = (
-            Player(Square.marks[0], score=0),
-            Player(Square.marks[1], score=0),
-        )
+        self.engine = Engine(marks_needed_to_win)
+        # a local session is saved as it goes and the last one continues on the next start
+        self.journal = None
+        if journal_path is not None and server is None:
+            self.journal = Journal(journal_path)
+            # a session of other rules is replaced by a new one
+            resumed = self.journal.resume(marks_needed_to_win) if resume else None
+            if resumed is not None:
+                self.engine = resumed
+            try:
+                self.journal.start(self.engine)
+            except OSError as error:
+                # eg. a read-only data directory; the game goes on without the journal
+                log.warning("The session isn't saved: %s", error)
+                self.journal = None
+        self.players = self.engine.players
+        self.round_over = self.engine.is_over
+
+        # computer player; plays the second player's mark;
+        # the players, the cache and the network client are imported only when used, to start faster
+        self.ai = None
+        # results of the alpha-beta search kept across runs
+        self.cache = None
+        if opponent == "ai":
+            from AI.alpha_beta import AlphaBetaPlayer
+
+            if cache_path is not None:
+                from AI.evaluation_cache import EvaluationCache
+
+                self.cache = EvaluationCache(cache_path)
+            self.ai = AlphaBetaPlayer(depth=depth, time_limit=time_limit, cache=self.cache)
+        elif opponent == "mcts":
+            from AI.mcts import MCTSPlayer
+
+            self.ai = MCTSPlayer(time_limit=time_limit)
+        elif opponent is not None:
+            raise ValueError("Invalid opponent", opponent)
+        self.ai_mark = self.players[-1].mark
+        # the search runs on a worker thread, so the window keeps responding; one search at a time
+        self.__ai_worker = None
+        if self.ai is not None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.__ai_worker = ThreadPoolExecutor(1, thread_name_prefix="ai")
+        # (position,) the running search started from; None when the computer isn't thinking
+        self.__ai_search: tuple | None = None
+        # seconds the thinking indicator is shown; None when it isn't animated
+        self.__thinking_time = None
+
+        # network game; the server checks the moves and the engine mirrors its room
+        self.client = None
+        self.my_mark = None
+        if server is not None:
+            if self.ai is not None:
+                raise ValueError("A network game can't have a computer opponent", opponent)
+            from Network.client import GameClient
+
+            self.client = GameClient(*server, on_message=self.__post_message)
+            self.client.join(room, marks_needed_to_win)
+        self.room = room
 
         # layout
         self.margin = 30
@@ -46,157 +124,445 @@ class Game:
 
         # upper section with players' scores
         self.score_bar = ScoreBar(
-            window=self.window,
+            window=self.window, renderer=self.renderer,
             x=self.game_x, y=self.game_y,
             width=self.game_width, height=100,
-            font=pygame.font.SysFont("Comic Sans MS", 56),
+            font=self.renderer.cache.font("Comic Sans MS", 56),
             fg_color=self.fg_color, bg_color=self.bg_color,
             players=self.players
         )
 
+        # marks drawn as blocks of color: on the minimap and on the zoomed out board
+        self.mark_colors = {self.players[0].mark: self.fg_color, self.players[-1].mark: RED}
         self.board = Board(
-            window=self.window,
+            window=self.window, renderer=self.renderer, engine=self.engine,
             x=self.margin, y=self.score_bar.y + self.score_bar.height,
             side_size=self.game_width,
             bg_color=self.bg_color, fg_color=self.fg_color, strike_through_color=GREY,
-            showed_grid_size=self.showed_grid_size)
-
-    def __is_winning_sequence(self, sequence: list[Square], mark) -> list[Square]:
-        counter = 0
-        start_index = 0
-        for i, sq in enumerate(sequence):
-            if sq.mark == mark:
-                if counter == 0:
-                    start_index = i
-                counter += 1
-            else:
-                if counter >= self.marks_needed_to_win:
-                    return sequence[start_index:start_index + counter]
-                counter = 0
-
-        if counter >= self.marks_needed_to_win:
-            return sequence[start_index:start_index + counter]
-
-        return []
-
-    def __check_if_win(self, square) -> tuple[list[Square], str]:
-        mark = square.mark
-        col_nr = square.col
-        row_nr = square.row
-
-        # - horizontal
-        # get right and left range of squares +/- marks needed to win
-        left_index = col_nr - (self.marks_needed_to_win - 1)
-        right_index = col_nr + (self.marks_needed_to_win - 1)
-        sequence = self.board.grid.get_row_range(row_nr, left_index, right_index + 1)
-        if sequence := self.__is_winning_sequence(sequence, mark):
-            return sequence, WinningOptions.horizontal
-
-        # | vertical
-        # get top and bottom range of squares +/- marks needed to win
-        # top_index < bottom_index
-        top_index = row_nr - (self.marks_needed_to_win - 1)
-        bottom_index = row_nr + (self.marks_needed_to_win - 1)
-        sequence = [self.board.grid[i, col_nr] for i in range(top_index, bottom_index + 1)]
-        if sequence := self.__is_winning_sequence(sequence, mark):
-            return sequence, WinningOptions.vertical
-
-        # \ negative diagonal
-        a = 1
-        b = row_nr - a * col_nr
-        row = lambda c: (a * c) + b
-        left_index = col_nr - (self.marks_needed_to_win - 1)
-        right_index = col_nr + (self.marks_needed_to_win - 1)
-        sequence = [
-            self.board.grid[row(col), col]
-            for col in range(left_index, right_index + 1)
-        ]
-        if sequence := self.__is_winning_sequence(sequence, mark):
-            return sequence, WinningOptions.neg_diagonal
-
-        # / positive diagonal
-        a = -1
-        b = row_nr - a * col_nr
-        row = lambda c: (a * c) + b
-        left_index = col_nr - (self.marks_needed_to_win - 1)
-        right_index = col_nr + (self.marks_needed_to_win - 1)
+            showed_grid_size=self.showed_grid_size, mark_colors=self.mark_colors)
+
+        # toggled with F3
+        self.stats_overlay = StatsOverlay(
+            window=self.window, renderer=self.renderer,
+            x=self.game_x, y=0,
+            width=self.game_width, height=self.margin,
+            font=self.renderer.cache.font("Comic Sans MS", 14),
+            fg_color=GREY, bg_color=self.bg_color,
+            stats=self.loop.stats
+        )
+        self.__stats_task = None
+
+        # toggled with F4, covers the board; recording starts with the first toggle unless enabled here
+        metrics.enabled |= instrument
+        self.metrics_overlay = MetricsOverlay(
+            window=self.window, renderer=self.renderer,
+            x=self.board.x, y=self.board.y,
+            width=self.board.width, height=self.board.height,
+            font=self.renderer.cache.font("Comic Sans MS", 14),
+            fg_color=self.fg_color, bg_color=self.bg_color,
+            metrics=metrics
+        )
+        self.__metrics_task = None
+
+        # toggled with M, in the top right corner of the board; a click on it shows the clicked place
+        minimap_size = self.board.width // 3
+        self.minimap = Minimap(
+            window=self.window, renderer=self.renderer,
+            x=self.board.x + self.board.width - minimap_size, y=self.board.y,
+            width=minimap_size, height=minimap_size,
+            bg_color=self.bg_color, fg_color=self.fg_color, view_color=GREY,
+            mark_colors=self.mark_colors,
+            engine=self.engine, board=self.board
+        )
+        # toggled with H, frames the cells extending the players' threats
+        self.threat_overlay = ThreatOverlay(
+            window=self.window, renderer=self.renderer,
+            engine=self.engine, board=self.board,
+            mark_colors=self.mark_colors, fg_color=self.fg_color
+        )
+        # 'row, col' typed after pressing G; None when not typing
+        self.__goto_text = None
+        # the position before the first of the undone moves; redo plays the moves toward it
+        self.__redo_target = None
+
+    def __check_if_game_ended(self, result: MoveResult):
+        if not result.is_win:
+            return
+
+        # only squares which are currently shown are crossed out
         sequence = [
-            self.board.grid[row(col), col]
-            for col in range(left_index, right_index + 1)
+            self.board.get_square(row, col)
+            for row, col in result.winning_run.cells
+            if self.board.is_visible(row, col)
         ]
-        if sequence := self.__is_winning_sequence(sequence, mark):
-            return sequence, WinningOptions.pos_diagonal
 
-        # not found
-        return [], ""
+        if sequence:
+            self.board.draw_strike_through(sequence, result.winning_run.option)
+
+        # the next click or key press starts a new round
+        self.round_over = True
+
+    def __place(self, row, col, redo=False):
+        if not redo:
+            self.__redo_target = None
+        # eg. the computer's move redone while its search runs
+        self.__ai_search = None
+        result = self.engine.place(row, col)
+        if self.journal is not None:
+            self.journal.move(row, col)
+            if result.is_win:
+                self.journal.result(self.engine.marks.index(result.mark))
+
+        square = self.board.get_square(row, col)
+        if square is not None:
+            square.mark = result.mark
+            self.board.draw_mark(square)
+        self.__draw_overlays()
+
+        self.__check_if_game_ended(result)
+        self.__schedule_ai_move()
+
+    def __schedule_ai_move(self):
+        if self.ai is None or self.round_over or self.engine.current_mark != self.ai_mark:
+            return
+        position = self.engine.position
+        if self.__ai_search is not None and self.__ai_search[0] is position:
+            return
 
-    def __check_if_game_ended(self, square):
-        sequence, winning_option = self.__check_if_win(square)
+        # the search gets its own engine; the position tells whether its move still fits when it comes back
+        self.__ai_search = position,
+        self.__ai_worker.submit(self.__search_ai_move, self.engine.copy(), position)
+        if self.__thinking_time is None:
+            self.__thinking_time = 0.0
+            self.loop.animate(self.__draw_thinking)
+
+    def __search_ai_move(self, engine, position):
+        # called on the worker thread
+        move = self.ai.choose_move(engine)
+        pygame.event.post(pygame.event.Event(AI_MOVE, position=position, move=move))
+
+    def __play_ai_move(self, position, move):
+        # a search started before an undo or a new round is dropped
+        if self.__ai_search is None or self.__ai_search[0] is not position:
+            return
+        self.__ai_search = None
+        if self.round_over or self.engine.current_mark != self.ai_mark or self.engine.position is not position:
+            return
 
-        if not sequence:
+        if self.cache is not None:
+            log.info("AI: %s, cache: %s", self.ai.stats, self.cache.stats)
+        else:
+            log.info("AI: %s", self.ai.stats)
+        self.__place(*move)
+
+    def __draw_thinking(self, elapsed) -> bool:
+        # an animation under the board while the computer searches; cleared when it's done
+        rect = pygame.Rect(self.board.x, self.board.y + self.board.height,
+                           self.board.width, self.height - self.board.y - self.board.height)
+        self.window.fill(self.bg_color, rect)
+        self.renderer.add_dirty(rect)
+        if self.__ai_search is None:
+            self.__thinking_time = None
+            return False
+
+        self.__thinking_time += elapsed
+        dots = "." * (int(self.__thinking_time * 3) % 4)
+        text = self.renderer.cache.text(self.stats_overlay.font, f"thinking{dots}", GREY)
+        self.window.blit(text, (rect.x, rect.y + (rect.height - text.get_height()) / 2))
+        return True
+
+    def __undo(self):
+        if not self.engine.history:
             return
+        self.__ai_search = None
+        if self.__redo_target is None:
+            self.__redo_target = self.engine.snapshot()
+
+        was_over = self.engine.is_over
+        row, col = self.engine.undo()
+        if self.journal is not None:
+            self.journal.undo()
+        self.round_over = False
+
+        square = self.board.get_square(row, col)
+        if square is not None:
+            square.mark = None
+            self.board.erase_mark(square)
+        if was_over:
+            # the strike through goes away with the winning mark
+            self.__redraw_board()
+        self.score_bar.draw()
 
-        # remove squares which are not currently shown
-        sequence = [sq for sq in sequence if sq in self.board.squares]
+        # back to the player's turn
+        if self.ai is not None and self.engine.current_mark == self.ai_mark and self.engine.history:
+            self.__undo()
+        self.__schedule_ai_move()
 
-        self.board.draw_strike_through(sequence, winning_option)
-        self.__increment_player_score(square.mark)
+    def __redo(self):
+        if self.__redo_target is None:
+            return
 
-        Game.wait_for_user_input()
+        move = self.engine.next_move_toward(self.__redo_target)
+        if move is None:
+            return
+        self.__place(*move, redo=True)
+        self.score_bar.draw()
+
+        # the computer's answer is redone with the player's move
+        if self.ai is not None and self.engine.current_mark == self.ai_mark:
+            self.__redo()
+
+    @staticmethod
+    def __post_message(command, args):
+        # called on the client's thread
+        pygame.event.post(pygame.event.Event(NETWORK_MESSAGE, command=command, args=args))
+
+    def __handle_message(self, command, args):
+        if command == WELCOME:
+            self.my_mark, marks_needed_to_win, *marks = args
+            pygame.display.set_caption(f"Tic Tac Toe - {self.room} ({self.my_mark})")
+            self.engine.marks_needed_to_win = int(marks_needed_to_win)
+            self.__start_round(marks)
+        elif command == MOVED:
+            row, col, _ = args
+            self.__place(int(row), int(col))
+        elif command == ROUND:
+            self.__start_round(args)
+        elif command == ERR:
+            log.warning("Server: %s", " ".join(args))
+        elif command == CLOSED:
+            # the board stays as the server left it
+            log.warning("Disconnected from the server")
+            self.client = None
+
+    def __start_round(self, marks):
+        self.engine.new_round()
+        self.engine.marks = tuple(marks)
         self.__set_new_round()
 
     def __set_new_round(self):
-        self.move_counter = 0
-        Square.reverse_marks()
-
+        # a resumed session may start with a finished round
+        self.round_over = self.engine.is_over
+        self.__redo_target = None
+        self.__ai_search = None
         self.window.fill(self.bg_color)
+        self.renderer.add_dirty(self.window.get_rect())
         self.board.reset()
         self.board.draw_grid()
         self.score_bar.draw()
+        self.stats_overlay.draw()
+        self.__draw_overlays()
+        self.__schedule_ai_move()
+
+    def __toggle_stats(self):
+        self.stats_overlay.toggle()
+        if self.stats_overlay.visible:
+            self.__stats_task = self.loop.call_every(1.0, self.__update_stats)
+        elif self.__stats_task is not None:
+            self.__stats_task.cancel()
+            self.__stats_task = None
+
+    def __update_stats(self):
+        self.loop.stats.sample()
+        # the go to prompt uses the same place
+        if self.__goto_text is None:
+            self.stats_overlay.draw()
+
+    def __draw_overlays(self):
+        # the ones over the board; drawn again after anything under them changes
+        self.threat_overlay.draw()
+        self.metrics_overlay.draw()
+        self.minimap.draw()
+
+    def __redraw_board(self):
+        self.board.draw_grid()
+        self.board.draw_squares()
+        self.__draw_overlays()
+
+    def __toggle_metrics(self):
+        metrics.enabled = True
+        self.metrics_overlay.toggle()
+        if self.metrics_overlay.visible:
+            self.__metrics_task = self.loop.call_every(1.0, self.metrics_overlay.draw)
+            return
 
-    def __increment_player_score(self, mark):
-        for player in self.players:
-            if player.mark == mark:
-                player.score += 1
-                return
+        self.__metrics_task.cancel()
+        self.__metrics_task = None
+        self.__redraw_board()
 
-    def run(self):
-        self.__set_new_round()
+    def __toggle_minimap(self):
+        self.minimap.toggle()
+        if not self.minimap.visible:
+            self.__redraw_board()
 
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_pos = pygame.mouse.get_pos()
-
-                    for square in self.board.squares:
-                        if not square.is_clicked and square.check_collision(*mouse_pos):
-                            self.move_counter += 1
-                            square.click(Square.marks[self.move_counter % 2])
-                            self.__check_if_game_ended(square)
-                            break
-
-                if event.type == pygame.KEYDOWN:
-                    # up
-                    if event.key in [pygame.K_UP, pygame.K_w]:
-                        self.board.move(Direction.up)
-                    # down
-                    elif event.key in [pygame.K_DOWN, pygame.K_s]:
-                        self.board.move(Direction.down)
-                    # left
-                    elif event.key in [pygame.K_LEFT, pygame.K_a]:
-                        self.board.move(Direction.left)
-                    # right
-                    elif event.key in [pygame.K_RIGHT, pygame.K_d]:
-                        self.board.move(Direction.right)
-
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
+    def __jump_to(self, row, col):
+        self.board.jump_to(row, col)
+        self.__draw_overlays()
+
+    def __zoom(self, steps):
+        self.board.zoom(steps)
+        self.__draw_overlays()
+
+    def __go_to_last_move(self):
+        if self.engine.history:
+            self.__jump_to(*self.engine.history[-1])
+
+    def __draw_goto_prompt(self):
+        if self.__goto_text is None:
+            self.stats_overlay.draw()
+            return
+
+        overlay = self.stats_overlay
+        rect = overlay.x, overlay.y, overlay.width, overlay.height
+        self.window.fill(self.bg_color, rect)
+        text = overlay.font.render(f"go to (row, col): {self.__goto_text}_", True, self.fg_color)
+        self.window.blit(text, (overlay.x, overlay.y + (overlay.height - text.get_height()) / 2))
+        self.renderer.add_dirty(rect)
+
+    def __type_goto(self, event):
+        # enter jumps to the typed cell, escape cancels
+        if event.key == pygame.K_RETURN:
+            try:
+                row, col = map(int, self.__goto_text.replace(",", " ").split())
+            except ValueError:
+                return
+            self.__goto_text = None
+            self.__jump_to(row, col)
+        elif event.key == pygame.K_ESCAPE:
+            self.__goto_text = None
+        elif event.key == pygame.K_BACKSPACE:
+            self.__goto_text = self.__goto_text[:-1]
+        elif event.unicode and event.unicode in "0123456789-, ":
+            self.__goto_text += event.unicode
+        self.__draw_goto_prompt()
 
     @staticmethod
-    def wait_for_user_input():
-        while True:
-            for event in pygame.event.get():
-                if (event.type == pygame.MOUSEBUTTONDOWN
-                        or event.type == pygame.KEYDOWN):
-                    return
+    def __dump_metrics():
+        path = time.strftime("metrics-%Y%m%d-%H%M%S.json")
+        metrics.dump(path)
+        log.info("Metrics saved to %s", path)
+
+    def __handle_event(self, event):
+        if event.type == pygame.QUIT:
+            if self.client is not None:
+                self.client.close()
+            if self.__ai_worker is not None:
+                # the cache is closed after the search using it
+                self.__ai_worker.shutdown(cancel_futures=True)
+                # the process pool of the monte carlo player
+                if hasattr(self.ai, "close"):
+                    self.ai.close()
+            if self.cache is not None:
+                self.cache.close()
+            if self.journal is not None:
+                self.journal.close()
+            pygame.quit()
+            exit()
+
+        if event.type == NETWORK_MESSAGE:
+            self.__handle_message(event.command, event.args)
+            return
+        if event.type == AI_MOVE:
+            self.__play_ai_move(event.position, event.move)
+            return
+
+        # the wheel also sends MOUSEWHEEL events; zooming works also between the rounds
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (4, 5):
+            return
+        if event.type == pygame.MOUSEWHEEL:
+            self.__zoom(event.y)
+            return
+
+        # undo can take back the winning move, so it works also between the rounds; not in network games
+        is_local = self.client is None and self.my_mark is None
+        if event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL and is_local:
+            if event.key == pygame.K_z and event.mod & pygame.KMOD_SHIFT or event.key == pygame.K_y:
+                self.__redo()
+            elif event.key == pygame.K_z:
+                self.__undo()
+            return
+
+        # navigation works also between the rounds
+        if event.type == pygame.KEYDOWN and self.__goto_text is not None:
+            self.__type_goto(event)
+            return
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            target = self.minimap.cell_at(*event.pos)
+            if target is not None:
+                self.__jump_to(*target)
+                return
+
+        if self.round_over:
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                if self.client is not None:
+                    self.client.new_round()
+                elif self.my_mark is None:
+                    self.engine.new_round()
+                    if self.journal is not None:
+                        self.journal.new_round()
+                    self.__set_new_round()
+            return
+
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            cell = self.board.cell_at(*event.pos)
+            if cell is not None and self.engine.mark_at(*cell) is None:
+                if self.client is not None:
+                    # placed when the server sends it back
+                    if self.engine.current_mark == self.my_mark:
+                        self.client.move(*cell)
+                # not while the computer is thinking
+                elif self.my_mark is None and self.__ai_search is None:
+                    self.__place(*cell)
+
+        if event.type == pygame.KEYDOWN:
+            # up
+            if event.key in [pygame.K_UP, pygame.K_w]:
+                self.board.move(Direction.up)
+            # down
+            elif event.key in [pygame.K_DOWN, pygame.K_s]:
+                self.board.move(Direction.down)
+            # left
+            elif event.key in [pygame.K_LEFT, pygame.K_a]:
+                self.board.move(Direction.left)
+            # right
+            elif event.key in [pygame.K_RIGHT, pygame.K_d]:
+                self.board.move(Direction.right)
+            # stats
+            elif event.key == pygame.K_F3:
+                self.__toggle_stats()
+            # instrumentation
+            elif event.key == pygame.K_F4:
+                self.__toggle_metrics()
+            elif event.key == pygame.K_F5:
+                self.__dump_metrics()
+            # navigation
+            elif event.key == pygame.K_m:
+                self.__toggle_minimap()
+            elif event.key == pygame.K_l:
+                self.__go_to_last_move()
+            # hints
+            elif event.key == pygame.K_h:
+                self.threat_overlay.toggle()
+            elif event.key == pygame.K_g:
+                self.__goto_text = ""
+                self.__draw_goto_prompt()
+            # zoom
+            elif event.key in [pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS]:
+                self.__zoom(1)
+            elif event.key in [pygame.K_MINUS, pygame.K_KP_MINUS]:
+                self.__zoom(-1)
+
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+            self.__draw_overlays()
+
+    def show(self):
+        """
+        draws and shows the first frame
+        """
+        self.__set_new_round()
+        self.renderer.flush()
+
+    def run(self):
+        self.show()
+        # one screen update per frame
+        self.loop.run(self.__handle_event, self.renderer.flush)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import bisect
+import collections
+import contextlib
+import sys
+import threading
+import time
+
+# returned by Metrics.timed while disabled; nullcontext can be entered any number of times
+NOT_TIMED = contextlib.nullcontext()
+
+
+class Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "total": self.total, "mean": self.mean, "max": self.max}
+
+
+class Metrics:
+    # upper bounds of the frame time histogram buckets, in milliseconds; the last bucket has no bound
+    frame_buckets = (1, 2, 4, 8, 16, 33, 50, 100, 250)
+
+    def __init__(self):
+        """
+        counters and timings of the hot paths; nothing is recorded until enabled,
+        so the instrumented code only pays for checking the flag
+        """
+        self.enabled = False
+        self.counters: dict[str, int] = collections.defaultdict(int)
+        self.timings: dict[str, Timing] = collections.defaultdict(Timing)
+        self.frame_histogram = [0] * (len(self.frame_buckets) + 1)
+        self.started = time.perf_counter()
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def add_time(self, name, seconds):
+        self.timings[name].add(seconds)
+
+    def timed(self, name):
+        """
+        a context manager adding the time of its block to the timing;
+        while disabled a shared one doing nothing, so nothing is created per call
+        """
+        if not self.enabled:
+            return NOT_TIMED
+        return self.__timed(name)
+
+    @contextlib.contextmanager
+    def __timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name].add(time.perf_counter() - start)
+
+    def add_frame(self, seconds):
+        self.add_time("frame", seconds)
+        self.frame_histogram[bisect.bisect_left(self.frame_buckets, seconds * 1000)] += 1
+
+    def reset(self):
+        self.counters.clear()
+        self.timings.clear()
+        self.frame_histogram = [0] * (len(self.frame_buckets) + 1)
+        self.started = time.perf_counter()
+
+    def snapshot(self) -> dict:
+        bounds = [f"<={bound}ms" for bound in self.frame_buckets] + [f">{self.frame_buckets[-1]}ms"]
+        return {
+            "elapsed": time.perf_counter() - self.started,
+            "counters": dict(self.counters),
+            "timings": {name: timing.to_dict() for name, timing in self.timings.items()},
+            "frame_histogram": dict(zip(bounds, self.frame_histogram)),
+        }
+
+    def dump(self, path):
+        # imported only when used, it's on the startup path otherwise
+        import json
+
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
+
+    def summary(self) -> list[str]:
+        """
+        lines for the overlay
+        """
+        lines = [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        lines += [
+            f"{name}: {timing.count} x {timing.mean * 1000:.3f} ms (max {timing.max * 1000:.2f} ms)"
+            for name, timing in sorted(self.timings.items())
+        ]
+        frames = sum(self.frame_histogram)
+        if frames:
+            lines.append("frames: " + " ".join(
+                f"{bound}:{count}"
+                for bound, count in zip((*self.frame_buckets, "inf"), self.frame_histogram) if count
+            ))
+        return lines
+
+
+# the instance used by the instrumented code
+metrics = Metrics()
+
+
+# <editor-fold desc="Profiling">
+class _StackSampler:
+    def __init__(self, interval):
+        """
+        periodically records the call stack of the main thread;
+        the result is in the collapsed format read by flame graph tools
+        :param interval: seconds between the samples
+        """
+        self.interval = interval
+        self.stacks: dict[str, int] = collections.Counter()
+        self.__thread_id = threading.main_thread().ident
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def __run(self):
+        while not self.__stop.wait(self.interval):
+            frame = sys._current_frames().get(self.__thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self.__thread.start()
+
+    def stop(self):
+        self.__stop.set()
+        self.__thread.join()
+
+    def dump(self, path):
+        with open(path, "w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+@contextlib.contextmanager
+def profile(path, sampling_interval=None):
+    """
+    profiles the code inside the block and saves the result to the path when it ends, also on exit()
+    :param sampling_interval: None for a cProfile file (read with pstats or snakeviz);
+                              seconds between the samples of a collapsed stacks file otherwise
+    """
+    import cProfile
+
+    profiler = _StackSampler(sampling_interval) if sampling_interval else cProfile.Profile()
+    if sampling_interval:
+        profiler.start()
+    else:
+        profiler.enable()
+
+    try:
+        yield profiler
+    finally:
+        if sampling_interval:
+            profiler.stop()
+            profiler.dump(path)
+        else:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+# </editor-fold>
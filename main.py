@@ -1,12 +1,70 @@
-import pygame
+import argparse
 
+from Network.protocol import parse_address
 
 if __name__ == '__main__':
-    pygame.init()
-    from game import Game
-
     width, height = 600, 700
     grid_size = 5
     marks_to_win = 5
-    game = Game(width, height, grid_size, marks_to_win)
-    game.run()
+    opponent = None  # "ai" or "mcts" to play against the computer
+
+    parser = argparse.ArgumentParser(description="Unlimited TicTacToe")
+    parser.add_argument("--serve", metavar="HOST:PORT", nargs="?", const="",
+                        help="host network games instead of playing")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="play on a game server")
+    parser.add_argument("--room", default="lobby", help="room to join on the server")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="keep the computer's search results in a sqlite file, reused in the next games")
+    parser.add_argument("--journal", metavar="FILE",
+                        help="where a local session is saved as it goes; the last one continues on the next start; "
+                             "in the user's data directory by default")
+    parser.add_argument("--no-journal", action="store_true", help="don't save the session")
+    parser.add_argument("--fresh", action="store_true", help="start a new session instead of the last one")
+    parser.add_argument("--metrics", metavar="FILE", help="record the instrumented code and save it on exit")
+    parser.add_argument("--profile", metavar="FILE", help="profile the session with cProfile")
+    parser.add_argument("--sample", metavar="MS", type=float,
+                        help="with --profile, sample the call stack every MS milliseconds instead")
+    parser.add_argument("--verbose", action="store_true", help="log the computer's search statistics")
+    args = parser.parse_args()
+    # the server always reports its address and its statistics
+    if args.verbose or args.serve is not None:
+        import logging
+
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.serve is not None:
+        import asyncio
+        from Network.server import serve
+
+        try:
+            asyncio.run(serve(*parse_address(args.serve), marks_needed_to_win=marks_to_win))
+        except KeyboardInterrupt:
+            pass
+        exit()
+
+    # imported here, so processes spawned by the computer players don't load pygame
+    import contextlib
+    import pygame
+
+    # only the modules the game uses; pygame.init would start the sound and the joysticks too
+    pygame.display.init()
+    pygame.font.init()
+    from game import Game
+    from instrumentation import metrics, profile
+    from Structures.journal import default_journal_path
+
+    server = parse_address(args.connect) if args.connect is not None else None
+    journal_path = None if args.no_journal else args.journal or default_journal_path()
+    game = Game(width, height, grid_size, marks_to_win, opponent=opponent, depth=4, time_limit=1.0,
+                cache_path=args.cache, journal_path=journal_path, resume=not args.fresh,
+                server=server, room=args.room, instrument=args.metrics is not None)
+
+    session = contextlib.nullcontext()
+    if args.profile is not None:
+        session = profile(args.profile, sampling_interval=args.sample and args.sample / 1000)
+    try:
+        with session:
+            game.run()
+    finally:
+        if args.metrics is not None:
+            metrics.dump(args.metrics)
@@ -1,61 +1,40 @@
-import pygame
-
-
 class Square:
-    marks = O, X = "O", "X"
+    __slots__ = ("viewport", "row", "col", "mark")
 
-    fg_color = None
-    window = None
-    font = None
-    side_size = None
+    def __init__(self, viewport, row=0, col=0, mark=None):
+        """
+        a view of a single cell of the engine's grid
+        :param viewport: the board showing the cell; gives its position on the screen
+        :param row, col: position in the grid
+        :param mark: mark placed on the cell; None if empty
+        """
+        self.viewport = viewport
 
-    def __init__(self, row=0, col=0, x=0, y=0):
         self.row = row
         self.col = col
 
-        self.x = x
-        self.y = y
+        self.mark = mark
+
+    # the screen position follows the viewport, so panning doesn't have to update every square
+    @property
+    def x(self) -> float:
+        return self.viewport.get_square_pos(self.row, self.col)[0]
 
-        self.is_clicked = False
-        self.mark = None
+    @property
+    def y(self) -> float:
+        return self.viewport.get_square_pos(self.row, self.col)[1]
 
-    def click(self, mark):
-        self.is_clicked ^= True
-        if self.is_clicked:
-            self.mark = mark
-            self.draw_mark()
+    @property
+    def side_size(self) -> float:
+        return self.viewport.square_size
 
-    def draw_mark(self):
-        text = Square.font.render(self.mark, True, Square.fg_color)
-        width, height = text.get_size()
-        x = self.x + (self.side_size - width) / 2
-        y = self.y + (self.side_size - height) / 2
-        Square.window.blit(text, (x, y))
-        pygame.display.update()
+    @property
+    def is_clicked(self) -> bool:
+        return self.mark is not None
 
     def check_collision(self, x, y) -> bool:
-        return (self.x <= x <= self.x + Square.side_size and
-                self.y <= y <= self.y + Square.side_size)
-
-    def set_pos(self, x, y):
-        self.x = x
-        self.y = y
-
-    @classmethod
-    def reverse_marks(cls):
-        cls.marks = cls.marks[::-1]
-
-    @classmethod
-    def new_square(cls, row, col):
-        return Square(row=row, col=col)
-
-    @classmethod
-    def set_globals(cls, fg_color, bg_color, font, side_size, window):
-        cls.fg_color = fg_color
-        cls.bg_color = bg_color
-        cls.font = font
-        cls.side_size = side_size
-        cls.window = window
+        return (self.x <= x <= self.x + self.side_size and
+                self.y <= y <= self.y + self.side_size)
 
     def __repr__(self):
         return f"({self.row}, {self.col}, {self.mark})"
@@ -0,0 +1,67 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from board import Board
+from consts import BLACK, WHITE, GREY, Direction
+from engine import Engine
+from UI.renderer import Renderer
+
+MOVES = [Direction.right, Direction.right, Direction.down, Direction.left, Direction.up, Direction.up, Direction.left]
+
+
+@pytest.fixture(scope="module")
+def window():
+    pygame.display.init()
+    pygame.font.init()
+    yield pygame.display.set_mode((600, 700))
+    pygame.quit()
+
+
+def new_board(window, engine, n) -> Board:
+    board = Board(window=window, renderer=Renderer(window), engine=engine,
+                  x=30, y=130, side_size=540,
+                  bg_color=WHITE, fg_color=BLACK, strike_through_color=GREY, showed_grid_size=n)
+    board.reset()
+    board.draw_grid()
+    board.draw_squares()
+    return board
+
+
+def pixels(window, board) -> bytes:
+    return pygame.image.tobytes(window.subsurface((board.x, board.y, board.width, board.height)), "RGB")
+
+
+@pytest.mark.parametrize("n", [3, 5, 20, 60])
+def test_scrolled_board_matches_redrawn_one(window, n):
+    engine = Engine(marks_needed_to_win=5)
+    for row, col in [(0, 0), (1, 1), (2, 0), (-1, 3), (4, -1), (3, 3)]:
+        engine.place(row, col)
+
+    window.fill(WHITE)
+    board = new_board(window, engine, n)
+    for direction in MOVES:
+        board.move(direction)
+        scrolled = pixels(window, board)
+        frame = window.copy()
+
+        window.fill(WHITE)
+        redrawn = new_board(window, engine, n)
+        redrawn.jump_to(board.tracker.row + n // 2, board.tracker.col + n // 2)
+        assert pixels(window, redrawn) == scrolled, direction
+
+        # the next move scrolls the scrolled frame, so the differences would pile up
+        window.blit(frame, (0, 0))
+
+
+@pytest.mark.parametrize("n", [3, 5, 20])
+def test_grid_lines_fill_the_gutters_of_cell_at(window, n):
+    window.fill(WHITE)
+    board = new_board(window, Engine(), n)
+    black = window.map_rgb(BLACK)
+    for x in range(board.x, board.x + board.width):
+        is_line = window.get_at_mapped((x, board.y)) == black
+        assert is_line == (board.cell_at(x, board.y) is None), x
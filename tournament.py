@@ -0,0 +1,181 @@
+"""
+headless games between the computer players in a pool of processes;
+every game is appended to a game archive as it finishes, the standings and the Elo ratings are printed at the end
+and saved next to the archive as '<archive>.json' together with the players of every game
+
+usage: python -m tournament [-n GAMES] [--players random heuristic search] [--k 4 5 6]
+                            [--workers N] [--archive FILE] [--scaling]
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# workers import only the engine and the players, never pygame
+from engine import Engine
+from AI.alpha_beta import AlphaBetaPlayer
+from Structures.game_record import ArchiveWriter, GameRecord
+
+MARKS = "O", "X"
+ELO_START = 1500
+ELO_K = 16
+
+
+class RandomPlayer:
+    def __init__(self, neighbourhood=1, seed=None):
+        """
+        an empty cell close to the marks, chosen at random
+        """
+        self.neighbourhood = neighbourhood
+        self.rng = random.Random(seed)
+
+    def choose_move(self, engine: Engine) -> tuple[int, int]:
+        if not engine.history:
+            return 0, 0
+
+        n = self.neighbourhood
+        cells = {
+            (row + i, col + j)
+            for row, col in engine.history
+            for i in range(-n, n + 1)
+            for j in range(-n, n + 1)
+        }
+        return self.rng.choice(sorted(cell for cell in cells if engine.mark_at(*cell) is None))
+
+
+# name --> a function creating the player
+PLAYERS = {
+    "random": lambda seed: RandomPlayer(seed=seed),
+    # the move ordering of the search alone: the best attack or defence on the next move
+    "heuristic": lambda seed: AlphaBetaPlayer(depth=1, time_limit=1.0),
+    "search": lambda seed: AlphaBetaPlayer(depth=3, time_limit=0.2),
+}
+
+
+# <editor-fold desc="Worker Functions">
+def play_game(players: tuple[str, str], marks_needed_to_win, reverse_marks, seed, max_moves=200) -> GameRecord:
+    """
+    :param players: names of the players of MARKS[0] and MARKS[1]
+    :param reverse_marks: MARKS[1] moves first, as in every other round of the game
+    :param max_moves: longer games end in a draw
+    """
+    engine = Engine(marks_needed_to_win, marks=MARKS[::-1] if reverse_marks else MARKS)
+    by_mark = {mark: PLAYERS[name](seed + i) for i, (mark, name) in enumerate(zip(MARKS, players))}
+    while not engine.is_over and len(engine.history) < max_moves:
+        engine.place(*by_mark[engine.current_mark].choose_move(engine))
+    return GameRecord.from_engine(engine)
+
+
+# </editor-fold>
+
+
+class Standings:
+    def __init__(self, names):
+        self.ratings = {name: float(ELO_START) for name in names}
+        # name --> [wins, draws, losses]
+        self.results = {name: [0, 0, 0] for name in names}
+
+    def add(self, first, second, score):
+        """
+        :param score: of the first player; 1 for a win, 0.5 for a draw, 0 for a loss
+        """
+        expected = 1 / (1 + 10 ** ((self.ratings[second] - self.ratings[first]) / 400))
+        self.ratings[first] += ELO_K * (score - expected)
+        self.ratings[second] -= ELO_K * (score - expected)
+
+        outcome = {1: 0, 0.5: 1, 0: 2}[score]
+        self.results[first][outcome] += 1
+        self.results[second][2 - outcome] += 1
+
+    def summary(self) -> list[str]:
+        lines = [f"  {'player':<12} {'elo':>6} {'wins':>6} {'draws':>6} {'losses':>6} {'score':>6}"]
+        for name in sorted(self.ratings, key=self.ratings.get, reverse=True):
+            wins, draws, losses = self.results[name]
+            games = wins + draws + losses
+            score = (wins + 0.5 * draws) / games if games else 0.0
+            lines.append(f"  {name:<12} {self.ratings[name]:6.0f} {wins:6} {draws:6} {losses:6} {score:6.0%}")
+        return lines
+
+    def to_dict(self) -> dict:
+        return {
+            name: {"elo": round(self.ratings[name], 1), "wins": wins, "draws": draws, "losses": losses}
+            for name, (wins, draws, losses) in self.results.items()
+        }
+
+
+def schedule(games, names, marks_needed_to_win) -> list[tuple[tuple[str, str], int, bool]]:
+    """
+    every pair of players at every k, both with either mark moving first, repeated until there are enough games
+    :return: (players, marks needed to win, reverse marks) of every game
+    """
+    pairs = list(itertools.combinations(names, 2)) or [(names[0], names[0])]
+    rounds = [
+        (players, k, reverse_marks)
+        for k, players, reverse_marks in itertools.product(marks_needed_to_win, pairs, (False, True))
+    ]
+    return list(itertools.islice(itertools.cycle(rounds), games))
+
+
+def run(games, names, marks_needed_to_win, workers, archive=None, seed=0) -> tuple[Standings, float]:
+    """
+    :return: the standings and the number of games per second
+    """
+    standings = Standings(names)
+    played = []
+    writer = ArchiveWriter(archive) if archive is not None else None
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = {
+                pool.submit(play_game, players, k, reverse_marks, seed + 2 * i): players
+                for i, (players, k, reverse_marks) in enumerate(schedule(games, names, marks_needed_to_win))
+            }
+            for future in as_completed(futures):
+                players = futures[future]
+                record = future.result()
+                score = 0.5 if record.winner is None else float(record.winner == MARKS[0])
+                standings.add(*players, score)
+                if writer is not None:
+                    played.append({"game": writer.write(record), "players": dict(zip(MARKS, players))})
+    finally:
+        if writer is not None:
+            writer.close()
+    games_per_second = games / (time.perf_counter() - start)
+
+    if archive is not None:
+        with open(f"{archive}.json", "w") as file:
+            json.dump({"standings": standings.to_dict(), "games": played}, file, indent=2)
+    return standings, games_per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description="self-play tournament of the computer players")
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("--players", nargs="+", default=list(PLAYERS), choices=list(PLAYERS))
+    parser.add_argument("--k", nargs="+", type=int, default=[4, 5, 6], help="marks needed to win, taken in turns")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes; all cores by default")
+    parser.add_argument("--archive", default="tournament.bin", help="game archive the games are appended to")
+    parser.add_argument("--scaling", action="store_true",
+                        help="play the games also on 1, 2, 4, ... processes and compare the speed")
+    args = parser.parse_args()
+
+    standings, games_per_second = run(args.games, args.players, args.k, args.workers, args.archive)
+    print(f"{args.games} games on {args.workers} processes, {games_per_second:.2f} games/s, saved to {args.archive}")
+    print("\n".join(standings.summary()))
+
+    if args.scaling:
+        print("processes   games/s   speedup")
+        single = None
+        for workers in sorted({2 ** i for i in range(args.workers.bit_length())} | {args.workers}):
+            _, speed = run(args.games, args.players, args.k, workers)
+            single = single or speed
+            print(f"  {workers:>9} {speed:9.2f} {speed / single:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()